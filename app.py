@@ -5,6 +5,8 @@ import threading
 import subprocess
 import tkinter as tk
 from ui.editor import CodeEditorUI
+from compiler.problemBank import shared_problem_bank
+from compiler.leaderboard import shared_leaderboard
 
 
 # ------------------- Button Class -------------------
@@ -143,7 +145,11 @@ class App:
             root = tk.Tk()
             root.title(f"{level} Editor")
             root.geometry("900x700")
-            CodeEditorUI(root)
+            # The Advanced level practises on problems from the local bank, ranked on a local leaderboard
+            if level == "Advanced":
+                CodeEditorUI(root, problem_bank=shared_problem_bank(), leaderboard=shared_leaderboard())
+            else:
+                CodeEditorUI(root)
             root.mainloop()
 
         threading.Thread(target=run_editor).start()
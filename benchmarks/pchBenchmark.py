@@ -0,0 +1,69 @@
+"""
+Compile-time benchmark for precompiled headers.
+
+Compiles the editor's default C++ Hello World template repeatedly with and
+without the managed PCH. Each compile uses a fresh empty build cache so only
+g++ time is measured. Run from the repository root:
+
+    python -m benchmarks.pchBenchmark --runs 5
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+from compiler.buildCache import BuildCache
+from compiler.comp import Compiler
+from compiler.pch import PchCache
+from ui.editor import CodeEditorUI
+
+
+def time_compiles(code, runs, use_pch, pch_cache):
+    times = []
+    for _ in range(runs):
+        build_dir = tempfile.mkdtemp()
+        try:
+            compiler = Compiler("C++", build_cache=BuildCache(build_dir), use_python_pool=False,
+                                pch_cache=pch_cache, use_pch=use_pch)
+            start = time.perf_counter()
+            _, error = compiler.build(code)
+            times.append(time.perf_counter() - start)
+            if error:
+                raise SystemExit(f"Compile failed:\n{error}")
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if not shutil.which("g++"):
+        print("g++ not found; skipping.")
+        return
+
+    code = CodeEditorUI.DEFAULT_CODE["C++"]
+    pch_dir = tempfile.mkdtemp()
+    try:
+        pch_cache = PchCache(pch_dir)
+        start = time.perf_counter()
+        pch_cache.include_args(code)
+        pch_build = time.perf_counter() - start
+
+        without = time_compiles(code, args.runs, False, None)
+        with_pch = time_compiles(code, args.runs, True, pch_cache)
+    finally:
+        shutil.rmtree(pch_dir, ignore_errors=True)
+
+    base, fast = statistics.median(without), statistics.median(with_pch)
+    print(f"One-time PCH build:     {pch_build * 1000:8.1f} ms")
+    print(f"Compile without PCH:    {base * 1000:8.1f} ms (median of {args.runs})")
+    print(f"Compile with PCH:       {fast * 1000:8.1f} ms (median of {args.runs})")
+    print(f"Reduction:              {(1 - fast / base) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
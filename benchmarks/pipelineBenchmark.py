@@ -0,0 +1,234 @@
+"""
+End-to-end benchmark of the code execution pipeline (Compiler.run_code).
+
+For each language it runs the editor's Hello World template and measures:
+
+    cold      first run with empty build/PCH caches and no warm Python worker
+    warm      repeated runs once everything is built and warm (result cache off)
+    cached    repeated runs answered from the result cache
+    stages    median per-stage time of the warm runs (write, compile, ...)
+    memory    median peak RSS of the program per warm run
+    throughput  N submissions pushed through by `--concurrency` threads at once
+
+Results are written as JSON; `--baseline` compares against an earlier file
+and exits with status 1 when a metric got worse by more than `--tolerance`.
+Languages whose toolchain isn't installed are skipped. Run from the
+repository root:
+
+    python -m benchmarks.pipelineBenchmark --output bench.json
+    python -m benchmarks.pipelineBenchmark --baseline bench.json --languages C++
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
+from compiler.benchmark import TimingStats
+from compiler.buildCache import BuildCache
+from compiler.comp import Compiler
+from compiler.pch import PchCache
+from compiler.pyWorker import PythonWorkerPool
+from compiler.resultCache import ResultCache
+from compiler.runResult import RunStatus, STAGES
+from ui.editor import CodeEditorUI
+
+TOOLS = {"Python": [], "Java": ["javac", "java"], "C++": ["g++"]}
+
+# (metric path, True if higher is better) compared in --baseline mode
+COMPARED = [
+    ("cold_ms.median", False),
+    ("warm_ms.median", False),
+    ("cached_ms.median", False),
+    ("peak_rss_kb", False),
+    ("throughput.per_second", True),
+    ("throughput.latency_ms.p95", False),
+]
+# Timing differences smaller than this are noise, whatever the percentage
+MIN_DELTA_MS = 0.5
+
+
+def _ms(values):
+    """min/median/p95 of a list of seconds, in milliseconds."""
+    return {k: round(v * 1000, 3) for k, v in asdict(TimingStats.of(values)).items()}
+
+
+def _timed_run(compiler, code):
+    start = time.perf_counter()
+    run = compiler.run_code(code)
+    elapsed = time.perf_counter() - start
+    if run.status != RunStatus.OK:
+        raise RuntimeError(f"{compiler.language} run failed ({run.status.value}):\n{run.render()}")
+    return run, elapsed
+
+
+# ---------------- Measurements -----------------
+def measure_cold(language, code, runs, scratch):
+    """Each run gets fresh build and PCH caches and a new (not yet started) Python worker pool."""
+    times = []
+    for i in range(runs):
+        pool = PythonWorkerPool()
+        compiler = Compiler(language, build_cache=BuildCache(os.path.join(scratch, f"build-{i}")),
+                            pch_cache=PchCache(os.path.join(scratch, f"pch-{i}")), python_pool=pool,
+                            use_result_cache=False)
+        try:
+            times.append(_timed_run(compiler, code)[1])
+        finally:
+            pool.shutdown()
+    return _ms(times)
+
+
+def measure_warm(compiler, code, runs):
+    """Warm latency, median stage timings and median peak RSS."""
+    _timed_run(compiler, code)  # build and warm up
+    runs_ = [_timed_run(compiler, code) for _ in range(runs)]
+    stages = {}
+    for name in STAGES:
+        values = [getattr(run.timings, name) for run, _ in runs_ if getattr(run.timings, name) is not None]
+        if values:
+            stages[name] = round(statistics.median(values) * 1000, 3)
+    rss = [run.process.peak_rss_kb for run, _ in runs_ if run.process.peak_rss_kb is not None]
+    return _ms([t for _, t in runs_]), stages, int(statistics.median(rss)) if rss else None
+
+
+def measure_cached(language, code, runs, scratch):
+    compiler = Compiler(language, result_cache=ResultCache(os.path.join(scratch, "results")))
+    _timed_run(compiler, code)  # fills the result cache
+    return _ms([_timed_run(compiler, code)[1] for _ in range(runs)])
+
+
+def measure_throughput(compiler, code, concurrency, submissions):
+    """Submissions per second (and per-submission latency) with `concurrency` in flight."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [t for _, t in pool.map(lambda _: _timed_run(compiler, code), range(submissions))]
+    elapsed = time.perf_counter() - start
+    return {"concurrency": concurrency, "submissions": submissions,
+            "per_second": round(submissions / elapsed, 2), "latency_ms": _ms(latencies)}
+
+
+def missing_tools(language):
+    return [tool for tool in TOOLS[language] if not shutil.which(tool)]
+
+
+def benchmark_language(language, args):
+    missing = missing_tools(language)
+    if missing:
+        return {"skipped": f"{', '.join(missing)} not found"}
+    code = CodeEditorUI.DEFAULT_CODE[language]
+    scratch = tempfile.mkdtemp(prefix="pipeline-bench-")
+    try:
+        compiler = Compiler(language, use_result_cache=False)
+        result = {"cold_ms": measure_cold(language, code, args.cold_runs, scratch)}
+        result["warm_ms"], result["stages_ms"], result["peak_rss_kb"] = measure_warm(compiler, code, args.runs)
+        result["cached_ms"] = measure_cached(language, code, args.runs, scratch)
+        result["throughput"] = measure_throughput(compiler, code, args.concurrency, args.submissions)
+        return result
+    except RuntimeError as e:
+        return {"error": str(e)}
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+# ---------------- Baseline comparison -----------------
+def _lookup(result, path):
+    for part in path.split("."):
+        if not isinstance(result, dict) or part not in result:
+            return None
+        result = result[part]
+    return result
+
+
+def compare(current, baseline, tolerance):
+    """Returns (report lines, regressions) for metrics present in both runs."""
+    lines = []
+    regressions = 0
+    for language, result in current["languages"].items():
+        base = baseline.get("languages", {}).get(language)
+        if not base or "skipped" in result or "skipped" in base:
+            continue
+        for path, higher_is_better in COMPARED:
+            now, before = _lookup(result, path), _lookup(base, path)
+            if not now or not before:
+                continue
+            change = now / before - 1
+            worse = -change if higher_is_better else change
+            if "_ms" in path and abs(now - before) < MIN_DELTA_MS:
+                worse = 0.0
+            flag = ""
+            if worse > tolerance:
+                flag = "  REGRESSION"
+                regressions += 1
+            elif worse < -tolerance:
+                flag = "  improved"
+            lines.append(f"{language:<7} {path:<28} {before:>12.2f} -> {now:>12.2f}  {change * 100:+7.1f} %{flag}")
+    return lines, regressions
+
+
+def summarize(results):
+    lines = []
+    for language, r in results["languages"].items():
+        if "skipped" in r or "error" in r:
+            lines.append(f"{language}: {r.get('skipped') or r['error']}")
+            continue
+        t = r["throughput"]
+        lines += [f"{language}:",
+                  f"  cold    median {r['cold_ms']['median']:9.1f} ms",
+                  f"  warm    median {r['warm_ms']['median']:9.1f} ms  p95 {r['warm_ms']['p95']:9.1f} ms",
+                  f"  cached  median {r['cached_ms']['median']:9.1f} ms",
+                  "  stages  " + "  ".join(f"{k} {v:.1f}" for k, v in r["stages_ms"].items()) + " (ms)",
+                  f"  memory  {r['peak_rss_kb'] / 1024:.1f} MB peak RSS per run" if r["peak_rss_kb"] else
+                  "  memory  n/a",
+                  f"  throughput {t['per_second']:.1f} runs/s at concurrency {t['concurrency']} "
+                  f"(latency p95 {t['latency_ms']['p95']:.1f} ms)"]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--languages", nargs="+", default=list(TOOLS), choices=list(TOOLS))
+    parser.add_argument("--runs", type=int, default=20, help="warm and cached runs per language")
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--submissions", type=int, default=40)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "runs": args.runs,
+            "cold_runs": args.cold_runs,
+        },
+        "languages": {language: benchmark_language(language, args) for language in args.languages},
+    }
+    print(summarize(results))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline, args.tolerance)
+        print(f"\nCompared with {args.baseline} (tolerance {args.tolerance * 100:.0f} %):")
+        print("\n".join(lines) or "No comparable metrics.")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+asyncio front end for Compiler.
+
+Every run goes through one JobScheduler: a FIFO semaphore that caps how many
+submissions compile/run at once, so hammering Run queues work instead of piling
+up threads and compilers. The editor drives it from a single background event
+loop thread (see background_loop).
+
+A run is Compiler.run_code on a worker thread rather than a pipeline rebuilt
+on asyncio.create_subprocess_exec: run_code is where the warm Python pool, the
+JVM daemon, the build and result caches and rlimits live, and an async copy of
+that pipeline would have to keep up with all of them. Only running jobs hold
+a thread (at most max_concurrent); queued ones are just futures on the loop.
+"""
+import asyncio
+import collections
+import threading
+import time
+
+from compiler.comp import Compiler
+from compiler.runResult import RunResult, RunStatus, StageTimings
+
+
+class JobScheduler:
+    """
+    FIFO semaphore with queue-depth metrics. Slots are handed to waiters in
+    arrival order. Bound to the event loop it is first used on.
+    """
+
+    def __init__(self, max_concurrent=2):
+        self.max_concurrent = max_concurrent
+        self._running = 0
+        self._waiters = collections.deque()
+        self.completed = 0
+        self.max_queue_depth = 0
+        self._total_wait = 0.0
+
+    async def _acquire(self):
+        if self._running < self.max_concurrent and not self._waiters:
+            self._running += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        try:
+            await fut  # _release hands its slot over by resolving fut
+        except asyncio.CancelledError:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+            elif fut.done() and not fut.cancelled():
+                self._release()  # got the slot just as we were cancelled; pass it on
+            raise
+
+    def _release(self):
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._running -= 1
+
+    async def run(self, job):
+        """Waits for a slot, then awaits job() (a coroutine function)."""
+        queued_at = time.perf_counter()
+        await self._acquire()
+        self._total_wait += time.perf_counter() - queued_at
+        try:
+            return await job()
+        finally:
+            self.completed += 1
+            self._release()
+
+    def metrics(self):
+        return {
+            "queued": len(self._waiters),
+            "running": self._running,
+            "completed": self.completed,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_wait": self._total_wait / self.completed if self.completed else 0.0,
+        }
+
+
+class AsyncCompiler:
+    def __init__(self, language=None, compiler=None, scheduler=None):
+        self.compiler = compiler or Compiler(language or "Python")
+        if language:
+            self.compiler.language = language
+        self.scheduler = scheduler or shared_scheduler()
+
+    @property
+    def language(self):
+        return self.compiler.language
+
+    @language.setter
+    def language(self, value):
+        self.compiler.language = value
+
+    async def execute(self, code, user_input="", on_output=None, max_output_bytes=None, cancel=None,
+                      language=None):
+        """Async Compiler.execute: returns (ProcessResult, error)."""
+        run = await self.run_code(code, user_input, on_output, max_output_bytes, cancel, language)
+        if run.status == RunStatus.CANCELLED and not run.process:
+            return None, run.render()
+        return run.process, run.error or None
+
+    async def run_code(self, code, user_input="", on_output=None, max_output_bytes=None, cancel=None,
+                       language=None):
+        """
+        Async Compiler.run_code: returns a RunResult. The run stops, killing
+        its process group, when the optional cancel Event is set or the task
+        is cancelled; a run still waiting for a scheduler slot never starts.
+        The language is fixed when the call is made, so switching the shared
+        compiler afterwards doesn't change a queued run.
+        """
+        language = language or self.compiler.language
+        if max_output_bytes is None:
+            max_output_bytes = self.compiler.MAX_OUTPUT_BYTES
+        # Repeat runs are answered from the result cache without queueing
+        cached = self.compiler.cached_result(code, user_input, on_output, max_output_bytes, language)
+        if cached:
+            return RunResult.of(cached)
+        return await self.scheduler.run(lambda: self._run(code, user_input, on_output, max_output_bytes, cancel,
+                                                          language))
+
+    async def _run(self, code, user_input, on_output, max_output_bytes, cancel, language):
+        # Compiler.run_code on a worker thread; it can't be interrupted, so task
+        # cancellation is passed on through the cancel Event
+        cancel = cancel or threading.Event()
+        if cancel.is_set():
+            return RunResult(RunStatus.CANCELLED, timings=StageTimings())
+        try:
+            return await asyncio.to_thread(self.compiler.run_code, code, user_input, on_output,
+                                           max_output_bytes, cancel, language)
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    def submit(self, code, user_input="", on_output=None, max_output_bytes=None, cancel=None, language=None):
+        """
+        Schedules run_code() on the background loop from any thread. Returns a
+        concurrent.futures.Future resolving to a RunResult; cancelling the
+        future (or setting cancel) stops the run. The language (default: the
+        current one) is taken now, on the caller's thread.
+        """
+        language = language or self.compiler.language
+        return background_loop().submit(self.run_code(code, user_input, on_output, max_output_bytes, cancel,
+                                                      language))
+
+    def metrics(self):
+        return self.scheduler.metrics()
+
+
+class BackgroundLoop:
+    """An asyncio event loop running forever on a daemon thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="compiler-loop")
+        self.thread.start()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def background_loop():
+    with _shared_lock:
+        if "loop" not in _shared:
+            _shared["loop"] = BackgroundLoop()
+        return _shared["loop"]
+
+
+def shared_scheduler(max_concurrent=2):
+    """The global scheduler used by AsyncCompiler instances on the background loop."""
+    with _shared_lock:
+        if "scheduler" not in _shared:
+            _shared["scheduler"] = JobScheduler(max_concurrent)
+        return _shared["scheduler"]
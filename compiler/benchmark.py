@@ -0,0 +1,98 @@
+"""
+Benchmark mode: build with optimizations, run the same input several times
+after a warm-up, and report the spread of wall and CPU times.
+
+A single unoptimized run says little when comparing two algorithms; the
+minimum and median of repeated optimized runs are far more stable.
+"""
+import statistics
+from dataclasses import dataclass, field
+
+from compiler.comp import Compiler, BuildCancelled, BuildTimedOut
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+@dataclass
+class TimingStats:
+    min: float
+    median: float
+    p95: float
+
+    @classmethod
+    def of(cls, values):
+        return cls(min(values), statistics.median(values), percentile(values, 95))
+
+    def describe(self):
+        return f"min {self.min * 1000:9.2f} ms  median {self.median * 1000:9.2f} ms  p95 {self.p95 * 1000:9.2f} ms"
+
+
+@dataclass
+class BenchmarkReport:
+    language: str
+    runs: int = 0
+    warmup: int = 0
+    flags: list = field(default_factory=list)
+    wall: TimingStats = None
+    cpu: TimingStats = None
+    peak_rss_kb: int = None
+    output: str = ""
+    error: str = ""
+
+    def summary(self):
+        if self.error:
+            return self.error
+        build = " ".join(self.flags) or "default flags"
+        lines = [f"Benchmark ({self.language}, {build}): {self.runs} runs after {self.warmup} warm-up", "",
+                 f"Wall  {self.wall.describe()}"]
+        if self.cpu:
+            lines.append(f"CPU   {self.cpu.describe()}")
+        if self.peak_rss_kb is not None:
+            lines.append(f"Peak RSS {self.peak_rss_kb / 1024:.1f} MB")
+        return "\n".join(lines)
+
+
+def benchmark(code, language, user_input="", runs=10, warmup=2, compiler=None, timeout=None):
+    """
+    Builds code in release mode and runs it warmup + runs times on
+    user_input. Stops with an error report on the first failing run.
+    """
+    compiler = compiler or Compiler(language, release=True)
+    timeout = timeout or compiler.RUN_TIMEOUT
+    runs = max(1, runs)
+    _, flags = compiler.toolchain(language)
+
+    try:
+        program, error = compiler.prepare(code, language=language)
+    except (BuildCancelled, BuildTimedOut) as e:
+        program, error = None, str(e) or "Build cancelled."
+    if error:
+        return BenchmarkReport(language, error=error)
+
+    results = []
+    try:
+        for i in range(warmup + runs):
+            result = program.execute(user_input, timeout=timeout, max_output_bytes=compiler.MAX_OUTPUT_BYTES)
+            if result.timed_out or result.truncated or result.returncode != 0:
+                reason = "timed out" if result.timed_out else "output limit" if result.truncated \
+                    else f"exit code {result.returncode}"
+                message = f"Benchmark stopped on run {i + 1}: {reason}\n{result.output.strip()}"
+                return BenchmarkReport(language, error=message.strip())
+            if i >= warmup:
+                results.append(result)
+    finally:
+        program.close()
+
+    report = BenchmarkReport(language, runs, warmup, list(flags), output=results[-1].output)
+    report.wall = TimingStats.of([r.wall_time for r in results])
+    cpu = [r.cpu_time for r in results if r.cpu_time is not None]
+    if len(cpu) == len(results):
+        report.cpu = TimingStats.of(cpu)
+    rss = [r.peak_rss_kb for r in results if r.peak_rss_kb is not None]
+    report.peak_rss_kb = max(rss) if rss else None
+    return report
@@ -0,0 +1,207 @@
+import hashlib
+import os
+from collections import Counter
+import shutil
+import subprocess
+import tempfile
+import threading
+
+
+def default_cache_dir():
+    """
+    Returns the directory used for DSA-Arcade caches.
+
+    Can be overridden with the DSA_ARCADE_CACHE environment variable. Keep it
+    private to one user: cached binaries are executed as whoever hits them.
+    """
+    base = os.environ.get("DSA_ARCADE_CACHE")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache", "dsa-arcade")
+    return base
+
+
+class BuildCache:
+    """
+    Content-addressed on-disk cache of compiled artifacts.
+
+    Each entry is a directory named after a hash of (language, compiler version,
+    flags, source). Entries are never modified after they are published, so
+    identical submissions reuse the same build. Least recently used entries are
+    evicted once the cache grows past max_bytes; entries handed out with
+    pin=True are skipped until they are released.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir or os.path.join(default_cache_dir(), "build")
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._pins = Counter()  # entry name -> users that must not lose it to eviction
+
+    # ---------------- Keys -----------------
+    def compiler_version(self, tool):
+        """First line of `<tool> --version`, memoized per tool."""
+        if tool not in self._versions:
+            try:
+                res = subprocess.run([tool, "-version" if tool == "javac" else "--version"],
+                                     capture_output=True, text=True, timeout=10)
+                lines = (res.stdout or res.stderr).strip().splitlines()
+                self._versions[tool] = lines[0] if lines else tool
+            except (OSError, subprocess.TimeoutExpired):
+                self._versions[tool] = tool
+        return self._versions[tool]
+
+    def key(self, language, code, tool, flags=()):
+        h = hashlib.sha256()
+        for part in (language, self.compiler_version(tool), "\0".join(flags), code):
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    # ---------------- Lookup / Store -----------------
+    def lookup(self, key):
+        """Returns the entry directory for key, or None on a miss."""
+        path = self.entry_path(key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return path
+
+    def get_or_build(self, key, build, workspace_pool=None, pin=False):
+        """
+        Returns (entry_dir, error).
+
+        On a miss, build(workdir) is called with an empty directory and must
+        return None on success or an error message. Failed builds are not
+        cached. With a workspace_pool the build runs in a (RAM-backed) workspace
+        and only successful artifacts are copied into the cache.
+
+        With pin=True a returned entry is not evicted until release(entry_dir),
+        so it can't vanish between the lookup and the run that uses it.
+        """
+        # Pinned from the start, so another thread's eviction can't remove the
+        # entry between the lookup (or publishing it) and handing it out
+        with self._lock:
+            self._pins[key] += 1
+            path = self.lookup(key)
+            if path:
+                self.hits += 1
+            else:
+                self.misses += 1
+        ok = False
+        try:
+            if path:
+                ok = True
+                return path, None
+            error = self._build_entry(key, build, workspace_pool)
+            if error:
+                return None, error
+            self._evict()
+            ok = True
+            return self.entry_path(key), None
+        finally:
+            if not (ok and pin):
+                self.release(self.entry_path(key))
+
+    def _build_entry(self, key, build, workspace_pool):
+        workspace = workspace_pool.acquire() if workspace_pool else None
+        staging = tempfile.mkdtemp(prefix="tmp-", dir=self.cache_dir)
+        try:
+            error = build(workspace or staging)
+            if error:
+                return error
+            if workspace:
+                shutil.copytree(workspace, staging, dirs_exist_ok=True)
+            try:
+                os.replace(staging, self.entry_path(key))
+            except OSError:
+                # Someone else published the same key first; theirs is identical
+                pass
+        finally:
+            if os.path.exists(staging):
+                shutil.rmtree(staging, ignore_errors=True)
+            if workspace:
+                workspace_pool.release(workspace)
+        return None
+
+    def release(self, entry_dir):
+        """Unpins an entry returned by get_or_build(..., pin=True)."""
+        name = os.path.basename(os.path.normpath(entry_dir))
+        with self._lock:
+            self._pins[name] -= 1
+            if self._pins[name] <= 0:
+                del self._pins[name]
+
+    # ---------------- Eviction -----------------
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith("tmp-") or not os.path.isdir(path):
+                continue
+            size = 0
+            for dirpath, _, files in os.walk(path):
+                for f in files:
+                    try:
+                        size += os.path.getsize(os.path.join(dirpath, f))
+                    except OSError:
+                        pass
+            try:
+                entries.append((os.path.getmtime(path), size, name))
+            except OSError:
+                pass
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in entries:
+                if total <= self.max_bytes:
+                    break
+                if name in self._pins:
+                    continue  # being built, or handed out and not yet released
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+                total -= size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            for _, _, name in self._entries():
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+    # ---------------- Stats -----------------
+    def stats(self):
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_build_cache():
+    """Process-wide BuildCache used by Compiler instances that don't get one."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = BuildCache()
+        return _shared_cache
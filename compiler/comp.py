@@ -1,7 +1,16 @@
-import subprocess
 import os
-import tempfile
-import shutil
+from compiler.process import run_process, ProcessResult, is_streamed, run_tool, BuildCancelled, BuildTimedOut
+from compiler.buildCache import shared_build_cache
+from compiler.pch import shared_pch_cache
+from compiler.resultCache import shared_result_cache, is_deterministic, source_is_deterministic
+from compiler.runResult import RunResult, RunStatus, StageTimings
+from compiler.workspace import shared_workspace_pool
+from compiler.pyWorker import shared_python_pool, PYTHON_ENV
+from compiler.jvmDaemon import shared_jvm_daemon, JvmDaemonUnavailable, JavaCompileError
+
+EXE_NAME = "main.exe" if os.name == "nt" else "main"
+TRACER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tracer.py")
+
 
 class Compiler:
     LANG_EXT = {
@@ -10,60 +19,312 @@ class Compiler:
         "C++": ".cpp"
     }
 
-    def __init__(self, language="Python"):
+    # Compiler executable and flags per compiled language (part of the cache key)
+    TOOLCHAIN = {
+        "Java": ("javac", []),
+        "C++": ("g++", []),
+    }
+    # Used for benchmark runs (release=True). javac has no optimizer (the JIT does
+    # that), so Java only drops debug info; Python gets -O.
+    RELEASE_TOOLCHAIN = {
+        "Python": ("python", ["-O"]),
+        "Java": ("javac", ["-g:none"]),
+        "C++": ("g++", ["-O2"]),
+    }
+
+    RUN_TIMEOUT = 5
+    # g++/javac (and PCH builds) are killed after this many seconds
+    COMPILE_TIMEOUT = 30
+    # Combined stdout+stderr kept per run; runaway print loops are killed here
+    MAX_OUTPUT_BYTES = 1024 * 1024
+
+    def __init__(self, language="Python", build_cache=None, python_pool=None, use_python_pool=True,
+                 jvm_daemon=None, use_jvm_daemon=False, limits=None, pch_cache=None, use_pch=True,
+                 workspace_pool=None, result_cache=None, use_result_cache=True, release=False, trace=None,
+                 compile_timeout=None, run_timeout=None):
         self.language = language
+        # Per-instance overrides of the class-wide defaults
+        self.COMPILE_TIMEOUT = compile_timeout or self.COMPILE_TIMEOUT
+        self.RUN_TIMEOUT = run_timeout or self.RUN_TIMEOUT
+        # Optimized builds for timing runs (see RELEASE_TOOLCHAIN)
+        self.release = release
+        # Optional TraceOptions: Python runs record list/dict/heapq calls (see compiler.tracer)
+        self.trace = trace
+        # Optional ResourceLimits (address space / CPU seconds) for submissions.
+        # Note the JVM reserves a lot of address space up front.
+        self.limits = limits
+        self.build_cache = build_cache or shared_build_cache()
+        # Warm forked interpreters for Python runs; None means cold `python` processes
+        self.python_pool = (python_pool or shared_python_pool()) if use_python_pool else None
+        # Optional long-lived JVM for Java runs; None means javac + java subprocesses
+        self.jvm_daemon = (jvm_daemon or shared_jvm_daemon()) if use_jvm_daemon else None
+        # Precompiled headers for C++ includes; None compiles headers from scratch
+        self.pch_cache = (pch_cache or shared_pch_cache()) if use_pch else None
+        # Reused scratch dirs (RAM-backed where possible) for sources and fresh builds
+        self.workspace_pool = workspace_pool or shared_workspace_pool()
+        # Memo of finished deterministic runs; None always runs the program
+        self.result_cache = (result_cache or shared_result_cache()) if use_result_cache else None
+
+    def toolchain(self, language=None):
+        """(tool, flags) for language (default: the current one) and build mode."""
+        language = language or self.language
+        if self.release:
+            return self.RELEASE_TOOLCHAIN[language]
+        return self.TOOLCHAIN.get(language, ("python", []))
+
+    # ---------------- Build -----------------
+    def build(self, code, cancel=None, timings=None, pin=False, language=None):
+        """
+        Compiles code for language (default: the current one) through the build cache.
+
+        Returns (artifact, error): the C++ executable path or the Java class
+        directory, or a compiler error message. Unchanged sources skip the
+        compiler entirely. Setting the optional cancel Event kills the compile
+        and raises BuildCancelled; a compile running past COMPILE_TIMEOUT
+        raises BuildTimedOut. Nothing is cached then. Writing the source is
+        added to the optional StageTimings. With pin=True the artifact's cache
+        entry is kept from eviction until build_cache.release() is called on it.
+        """
+        lang = language or self.language
+        timings = timings if timings is not None else StageTimings()
+        tool, flags = self.toolchain(lang)
+        src_name = "Main" + self.LANG_EXT[lang]
 
-    def run_code(self, code, user_input=""):
-        lang = self.language
+        def compile_into(workdir):
+            src = os.path.join(workdir, src_name)
+            with timings.stage("write"), open(src, "w") as f:
+                f.write(code)
+            pch = []
+            if lang == "Java":
+                cmd = [tool, *flags, src]
+            else:
+                pch = self.pch_cache.include_args(code, tool, flags, self.workspace_pool, cancel,
+                                                  self.COMPILE_TIMEOUT) if self.pch_cache else []
+                cmd = [tool, *flags, *pch, src, "-o", os.path.join(workdir, EXE_NAME)]
+            stderr = run_tool(cmd, cancel, self.COMPILE_TIMEOUT)
+            if stderr and pch and not os.path.exists(pch[1]):
+                # The PCH was evicted under us; compile the headers the slow way
+                cmd = [tool, *flags, src, "-o", os.path.join(workdir, EXE_NAME)]
+                stderr = run_tool(cmd, cancel, self.COMPILE_TIMEOUT)
+            return stderr or None
+
+        key = self.build_cache.key(lang, code, tool, flags)
+        entry, error = self.build_cache.get_or_build(key, compile_into, self.workspace_pool, pin=pin)
+        if error:
+            return None, error
+        if lang == "Java":
+            return entry, None
+        return os.path.join(entry, EXE_NAME), None
+
+    def cache_stats(self):
+        """Hit/miss/eviction counters and size of the build cache."""
+        return self.build_cache.stats()
+
+    # ---------------- Result Cache -----------------
+    def _result_key(self, code, user_input, max_output_bytes, language=None):
+        lang = language or self.language
+        tool, flags = self.toolchain(lang)
+        if lang == "Python" and self.python_pool:
+            tool = self.python_pool.python  # pool runs use its interpreter, not `python` on PATH
+        settings = (flags, self.RUN_TIMEOUT, max_output_bytes, self.limits.as_dict() if self.limits else None)
+        return self.result_cache.key(lang, self.build_cache.compiler_version(tool), code, user_input, settings)
+
+    def cached_result(self, code, user_input="", on_output=None, max_output_bytes=None, language=None):
+        """
+        Returns the remembered result of an earlier identical run (marked
+        cached=True, output replayed through on_output), or None.
+        """
+        lang = language or self.language
+        if not self.result_cache or self.trace or lang not in self.LANG_EXT:
+            return None
+        if is_streamed(user_input) or not source_is_deterministic(lang, code):
+            return None
+        fields = self.result_cache.lookup(self._result_key(code, user_input, max_output_bytes, lang))
+        if fields is None:
+            return None
+        result = ProcessResult(**{**fields, "cached": True})
+        if on_output:
+            for stream in ("stdout", "stderr"):
+                if getattr(result, stream):
+                    on_output(stream, getattr(result, stream))
+        return result
+
+    def remember_result(self, code, user_input, max_output_bytes, result, language=None):
+        """Stores result if the run looks deterministic (see resultCache)."""
+        lang = language or self.language
+        if is_streamed(user_input):
+            return  # generated / file inputs aren't hashed
+        if self.trace:
+            return  # the trace log is part of what the run produces
+        if self.result_cache and result and not result.cached and is_deterministic(lang, code, result):
+            self.result_cache.store(self._result_key(code, user_input, max_output_bytes, lang), result)
+
+    # ---------------- Prepare -----------------
+    def prepare(self, code, timings=None, cancel=None, language=None):
+        """
+        Compiles code once and returns (program, error). The Program can then be
+        executed against any number of inputs; close() it when done. Write and
+        compile times are added to the optional StageTimings; cancel and
+        compile timeouts raise as in build(). language overrides the current
+        one for this call only, so a shared Compiler needn't be switched.
+        """
+        lang = language or self.language
+        timings = timings if timings is not None else StageTimings()
         ext = self.LANG_EXT.get(lang)
         if not ext:
-            return f"Language {lang} not supported."
+            return None, f"Language {lang} not supported."
 
-        try:
-            if lang == "Java":
-                # Create a temp directory
-                tmpdir = tempfile.mkdtemp()
-                file_path = os.path.join(tmpdir, "Main.java")
-                with open(file_path, "w") as f:
-                    f.write(code)
+        if lang == "Python":
+            _, flags = self.toolchain(lang)
+            if self.python_pool:
+                return Program(lang, code=code, python_pool=self.python_pool, limits=self.limits,
+                               optimize=self.release, trace=self.trace), None
+            workspace = self.workspace_pool.acquire()
+            path = os.path.join(workspace, "main.py")
+            with timings.stage("write"), open(path, "w") as f:
+                f.write(code)
+            tracer = []
+            if self.trace:
+                t = self.trace
+                tracer = [TRACER_SCRIPT, "--log", os.path.abspath(t.path), "--sample", str(t.sample_every),
+                          "--ops", ",".join(t.ops or ()), "--max-events", str(t.max_events)]
+            return Program(lang, cmd=["python", *flags, *tracer, path], limits=self.limits, env=PYTHON_ENV,
+                           workspace=workspace, workspace_pool=self.workspace_pool), None
 
-                # Compile Java
-                compile_res = subprocess.run(["javac", file_path], capture_output=True, text=True)
-                if compile_res.stderr:
-                    return f"Compile Error:\n{compile_res.stderr}"
+        with timings.stage("compile"):
+            artifact, error = self.build(code, cancel, timings, pin=True, language=lang)
+        if error:
+            return None, f"Compile Error:\n{error}"
+        # The build stays pinned in the cache until the Program is closed
+        build_cache, entry = self.build_cache, artifact if lang == "Java" else os.path.dirname(artifact)
+        release = lambda: build_cache.release(entry)
+        if lang == "Java":
+            return Program(lang, cmd=["java", "-cp", artifact, "Main"], limits=self.limits, release=release), None
+        return Program(lang, cmd=[artifact], limits=self.limits, release=release), None
 
-                # Run Java
-                cmd = ["java", "-cp", tmpdir, "Main"]
-                result = subprocess.run(cmd, input=user_input, capture_output=True, text=True, timeout=5)
+    # ---------------- Run -----------------
+    def execute(self, code, user_input="", on_output=None, max_output_bytes=None, cancel=None, language=None):
+        """
+        Runs code and returns (result, error): a ProcessResult with output,
+        exit status and resource usage, or a compile/setup error message.
+        See run_code for the arguments.
+        """
+        run = self.run_code(code, user_input, on_output, max_output_bytes, cancel, language)
+        if run.status == RunStatus.CANCELLED and not run.process:
+            return None, run.render()
+        return run.process, run.error or None
 
-            else:
-                # Other languages use tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmpfile:
-                    tmpfile.write(code.encode())
-                    tmpfile_path = tmpfile.name
-
-                if lang == "Python":
-                    cmd = ["python", tmpfile_path]
-                elif lang == "C++":
-                    exe_file = tmpfile_path + "_exe"
-                    compile_res = subprocess.run(["g++", tmpfile_path, "-o", exe_file], capture_output=True, text=True)
-                    if compile_res.stderr:
-                        return f"Compile Error:\n{compile_res.stderr}"
-                    cmd = [exe_file]
-
-                result = subprocess.run(cmd, input=user_input, capture_output=True, text=True, timeout=5)
-
-        except subprocess.TimeoutExpired:
-            return "Execution timed out."
+    def run_code(self, code, user_input="", on_output=None, max_output_bytes=None, cancel=None, language=None):
+        """
+        Runs code and returns a RunResult: status, stdout/stderr, exit code and
+        per-stage timings (RunResult.render() gives the console text).
+        user_input is a str, or a FileInput / StreamInput (see
+        compiler.generators) that is streamed into the program's stdin.
+
+        on_output(stream, text) is called with stdout/stderr chunks as the
+        program produces them. Output beyond max_output_bytes (default
+        MAX_OUTPUT_BYTES) is dropped and the program is killed.
+
+        Setting the optional cancel Event (threading.Event) stops the compile
+        or run, killing its whole process group; the result is CANCELLED.
+        The compile and the run have separate timeouts (COMPILE_TIMEOUT,
+        RUN_TIMEOUT). language overrides the current one for this call only.
+        """
+        lang = language or self.language
+        if lang not in self.LANG_EXT:
+            return RunResult.failed(f"Language {lang} not supported.")
+        if max_output_bytes is None:
+            max_output_bytes = self.MAX_OUTPUT_BYTES
+
+        cached = self.cached_result(code, user_input, on_output, max_output_bytes, lang)
+        if cached:
+            return RunResult.of(cached)
+
+        timings = StageTimings()
+        program = None
+        try:
+            # The shared JVM can't apply per-run rlimits, so limited runs use plain processes
+            if (lang == "Java" and self.jvm_daemon and not self.limits and not is_streamed(user_input)
+                    and self.jvm_daemon.accepts(code)):
+                try:
+                    # The daemon compiles in memory as part of the run
+                    result = self.jvm_daemon.run(code, user_input, timeout=self.RUN_TIMEOUT,
+                                                 on_output=on_output, max_output_bytes=max_output_bytes)
+                    timings.add_process(result)
+                    with timings.stage("cleanup"):
+                        self.remember_result(code, user_input, max_output_bytes, result, lang)
+                    return RunResult.of(result, timings)
+                except JavaCompileError as e:
+                    return RunResult.failed(f"Compile Error:\n{e}", timings)
+                except JvmDaemonUnavailable:
+                    pass  # fall back to javac + java below
+
+            program, error = self.prepare(code, timings, cancel, language=lang)
+            if error:
+                return RunResult.failed(error, timings)
+            result = program.execute(user_input, timeout=self.RUN_TIMEOUT, on_output=on_output,
+                                     max_output_bytes=max_output_bytes, cancel=cancel)
+            timings.add_process(result)
+            with timings.stage("cleanup"):
+                # Hand the workspace back (compiled artifacts live in the build cache)
+                program.close()
+                program = None
+                self.remember_result(code, user_input, max_output_bytes, result, lang)
+            return RunResult.of(result, timings)
+
+        except BuildCancelled:
+            return RunResult(RunStatus.CANCELLED, timings=timings)
+        except BuildTimedOut as e:
+            return RunResult(RunStatus.TIMEOUT, timings=timings, error=str(e))
         except Exception as e:
-            return f"Error: {e}"
+            return RunResult.failed(f"Error: {e}", timings)
         finally:
-            # Clean up temp files
-            if lang == "Java":
-                shutil.rmtree(tmpdir)
-            else:
-                os.remove(tmpfile_path)
-                if lang == "C++" and os.path.exists(exe_file):
-                    os.remove(exe_file)
+            if program:
+                program.close()
+
+
+def format_output(result, max_output_bytes=None):
+    """Renders a ProcessResult the way the editor console shows it."""
+    return RunResult.of(result).render(max_output_bytes)
+
+
+class Program:
+    """
+    A prepared submission: either a command line (compiled binary, `java Main`,
+    `python file.py`) or Python source for the warm worker pool.
+    """
+
+    def __init__(self, language, cmd=None, code=None, python_pool=None, limits=None,
+                 workspace=None, workspace_pool=None, optimize=False, trace=None, release=None, env=None):
+        self.language = language
+        self.limits = limits
+        self.env = env  # extra environment variables for cmd
+        self.optimize = optimize  # pool runs only: compile like `python -O`
+        self.trace = trace  # pool runs only; cold runs put the tracer in cmd
+        self.cmd = cmd
+        self.code = code
+        self.python_pool = python_pool
+        self.workspace = workspace
+        self.workspace_pool = workspace_pool
+        self.release = release  # unpins the build cache entry the command runs from
+
+    def execute(self, user_input="", timeout=5, on_output=None, max_output_bytes=None, cancel=None):
+        """Runs once and returns a ProcessResult; setting cancel kills the run."""
+        if self.python_pool:
+            return self.python_pool.run(self.code, user_input, timeout=timeout, on_output=on_output,
+                                        max_output_bytes=max_output_bytes, limits=self.limits,
+                                        optimize=self.optimize, trace=self.trace, cancel=cancel)
+        cmd = self.cmd
+        if on_output and self.language == "Python":
+            cmd = [cmd[0], "-u", *cmd[1:]]  # unbuffered so prints show up as they happen
+        env = {**os.environ, **self.env} if self.env else None
+        return run_process(cmd, user_input, timeout=timeout, on_output=on_output,
+                           max_output_bytes=max_output_bytes, limits=self.limits, cancel=cancel, env=env)
 
-        return f"{result.stdout}{result.stderr}".strip() or "No output."
+    def close(self):
+        if self.workspace:
+            self.workspace_pool.release(self.workspace)
+        self.workspace = None
+        if self.release:
+            self.release()
+        self.release = None
@@ -0,0 +1,162 @@
+"""
+Empirical complexity profiling: run a submission on inputs of growing size and
+fit the measured runtimes against common growth models.
+"""
+import math
+from dataclasses import dataclass, field
+
+from compiler.comp import Compiler, BuildCancelled, BuildTimedOut
+from compiler.generators import random_array
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000, 1000000)
+# Tried when DEFAULT_SIZES times out too early to fit: exponential code only finishes on tiny inputs
+EXPONENTIAL_SIZES = (8, 12, 16, 20, 24)
+
+MODELS = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(n),
+    "O(n)": lambda n: float(n),
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n^2)": lambda n: float(n) ** 2,
+    "O(2^n)": lambda n: 2.0 ** min(n, 1000),
+}
+
+
+def array_input(n, seed=0):
+    """Default generator: n on the first line, then n random integers (streamed)."""
+    return random_array(n, seed)
+
+
+@dataclass
+class SizeSample:
+    n: int
+    wall_time: float
+    cpu_time: float = None
+    peak_rss_kb: int = None
+    ok: bool = True
+    timed_out: bool = False
+
+
+@dataclass
+class ComplexityReport:
+    samples: list = field(default_factory=list)
+    estimate: str = ""
+    # Model name -> relative residual of the least-squares fit (lower is better)
+    fits: dict = field(default_factory=dict)
+    error: str = ""
+
+    def summary(self):
+        if self.error:
+            return self.error
+        lines = [f"Estimated complexity: {self.estimate or 'not enough data'}", ""]
+        for s in self.samples:
+            cpu = f"{s.cpu_time * 1000:9.1f} ms cpu" if s.cpu_time is not None else ""
+            rss = f"{s.peak_rss_kb / 1024:7.1f} MB" if s.peak_rss_kb is not None else ""
+            status = "" if s.ok else "  (stopped: time limit)" if s.timed_out else "  (stopped: error)"
+            lines.append(f"n={s.n:<9} {s.wall_time * 1000:9.1f} ms {cpu} {rss}{status}")
+        return "\n".join(lines)
+
+
+def fit_models(points, models=MODELS):
+    """
+    Fits t = a * f(n) + b for every model by least squares and returns
+    {model: normalized residual}. Models with a negative slope are rejected.
+    """
+    fits = {}
+    ts = [t for _, t in points]
+    scale = sum(t * t for t in ts) or 1.0
+    for name, f in models.items():
+        xs = [f(n) for n, _ in points]
+        if max(xs) > 1e100:
+            continue  # e.g. 2^n at n=1e5: can't be what we measured
+        k = len(xs)
+        mx = sum(xs) / k
+        mt = sum(ts) / k
+        sxx = sum((x - mx) ** 2 for x in xs)
+        if sxx == 0:
+            a, b = 0.0, mt
+        else:
+            a = sum((x - mx) * (t - mt) for x, t in zip(xs, ts)) / sxx
+            b = mt - a * mx
+        if a < 0:
+            continue
+        residual = sum((a * x + b - t) ** 2 for x, t in zip(xs, ts))
+        fits[name] = residual / scale
+    return fits
+
+
+def best_model(fits):
+    """Picks the best fit, preferring the simpler model when fits are near-equal."""
+    order = list(MODELS)
+    best = None
+    for name in order:
+        if name not in fits:
+            continue
+        if best is None or fits[name] < fits[best] * 0.8:
+            best = name
+    return best
+
+
+def _measure(program, sizes, generator, timeout, max_output_bytes):
+    """SizeSamples for each size in turn, up to and including the first that fails or times out."""
+    samples = []
+    for n in sizes:
+        result = program.execute(generator(n), timeout=timeout, max_output_bytes=max_output_bytes)
+        ok = not result.timed_out and result.returncode == 0
+        samples.append(SizeSample(n, result.wall_time, result.cpu_time, result.peak_rss_kb, ok, result.timed_out))
+        if not ok:
+            break
+    return samples
+
+
+def _fit(samples):
+    """(fits, estimate) over the samples that finished; no estimate from fewer than 3."""
+    # Prefer CPU time where available: it ignores scheduling noise
+    points = [(s.n, s.cpu_time if s.cpu_time is not None else s.wall_time) for s in samples if s.ok]
+    if len(points) < 3:
+        return {}, ""
+    fits = fit_models(points)
+    return fits, best_model(fits) or ""
+
+
+def profile(code, language, sizes=DEFAULT_SIZES, generator=array_input, compiler=None, timeout=None,
+            small_sizes=EXPONENTIAL_SIZES):
+    """
+    Runs code once per size with generator(n) as stdin and fits the runtimes.
+    Stops at the first size that fails or hits the time limit, since larger
+    inputs would only take longer. If the time limit cuts the ladder short
+    before there is anything to fit, small_sizes are tried too: exponential
+    code shows up there as O(2^n). Code that times out even on those is
+    reported as super-polynomial.
+    """
+    compiler = compiler or Compiler(language)
+    timeout = timeout or compiler.RUN_TIMEOUT
+
+    try:
+        program, error = compiler.prepare(code, language=language)
+    except (BuildCancelled, BuildTimedOut) as e:
+        program, error = None, str(e) or "Build cancelled."
+    if error:
+        return ComplexityReport(error=error)
+
+    report = ComplexityReport()
+    small = []
+    try:
+        # Warm-up on the smallest size so one-off startup costs don't skew the fit
+        warm_up = min(sizes[0], small_sizes[0]) if small_sizes else sizes[0]
+        program.execute(generator(warm_up), timeout=timeout, max_output_bytes=compiler.MAX_OUTPUT_BYTES)
+        report.samples = _measure(program, sizes, generator, timeout, compiler.MAX_OUTPUT_BYTES)
+        report.fits, report.estimate = _fit(report.samples)
+        if not report.estimate and report.samples[-1].timed_out and small_sizes:
+            small = _measure(program, small_sizes, generator, timeout, compiler.MAX_OUTPUT_BYTES)
+    finally:
+        program.close()
+
+    if small:
+        fits, estimate = _fit(small)
+        if estimate == "O(2^n)":
+            report.samples, report.fits, report.estimate = small, fits, estimate
+        elif small[-1].timed_out and sum(s.ok for s in small) < 3:
+            report.samples = small
+            report.estimate = f"super-polynomial (timed out at n={small[-1].n})"
+    return report
@@ -0,0 +1,130 @@
+"""
+Background checking while the learner types.
+
+After a pause in typing the editor hands the buffer to a SpeculativeChecker.
+It runs a quick syntax check (compile() for Python, g++ -fsyntax-only for
+C++) and, if that passes, a full build through the build cache, so that a
+following Run finds the binary already there. javac has no syntax-only mode,
+so for Java the build is the check. Submitting a newer buffer cancels the job
+in flight, killing its compiler process.
+"""
+import os
+import re
+import threading
+from dataclasses import dataclass
+
+from compiler.comp import Compiler, BuildCancelled, BuildTimedOut, run_tool
+
+# main.cpp:3:5: error: ...   /   Main.java:3: error: ...
+_GCC_JAVAC = re.compile(r"^(?:.*[\\/])?Main\.(?:cpp|java):(\d+):(?:(\d+):)?\s*"
+                        r"(fatal error|error|warning):\s*(.*)$")
+
+
+@dataclass
+class Diagnostic:
+    line: int
+    column: int  # 1-based, 0 when the tool didn't say
+    severity: str  # "error" or "warning"
+    message: str
+
+
+def parse_diagnostics(text):
+    """Diagnostics from g++/javac output; unparseable errors land on line 1."""
+    diagnostics = []
+    for raw in text.splitlines():
+        m = _GCC_JAVAC.match(raw.strip())
+        if m:
+            severity = "warning" if m.group(3) == "warning" else "error"
+            diagnostics.append(Diagnostic(int(m.group(1)), int(m.group(2) or 0), severity, m.group(4)))
+    if not diagnostics and text.strip():
+        # e.g. linker errors, which have no source position
+        diagnostics.append(Diagnostic(1, 0, "error", text.strip().splitlines()[-1]))
+    return diagnostics
+
+
+def check_syntax(compiler, code, cancel=None):
+    """Quick check without producing a build; returns a list of Diagnostics."""
+    lang = compiler.language
+    if lang == "Python":
+        try:
+            compile(code, "main.py", "exec")
+        except SyntaxError as e:
+            return [Diagnostic(e.lineno or 1, e.offset or 0, "error", e.msg)]
+        except ValueError as e:  # e.g. null bytes in the source
+            return [Diagnostic(1, 0, "error", str(e))]
+        return []
+    if lang != "C++":
+        return []
+
+    tool, flags = compiler.toolchain()
+    workspace = compiler.workspace_pool.acquire()
+    try:
+        src = os.path.join(workspace, "Main.cpp")
+        with open(src, "w") as f:
+            f.write(code)
+        pch = compiler.pch_cache.include_args(code, tool, flags, compiler.workspace_pool, cancel,
+                                              compiler.COMPILE_TIMEOUT) if compiler.pch_cache else []
+        return parse_diagnostics(run_tool([tool, *flags, *pch, "-fsyntax-only", src], cancel,
+                                          compiler.COMPILE_TIMEOUT))
+    finally:
+        compiler.workspace_pool.release(workspace)
+
+
+class SpeculativeChecker:
+    """
+    Runs one check-then-build job at a time on a background thread. Starting
+    a new job cancels the previous one.
+    """
+
+    def __init__(self, compiler=None):
+        self.compiler = compiler or Compiler()
+        self._cancel = None
+        self._lock = threading.Lock()
+        # One compiler object, one job at a time: a new job waits for the
+        # cancelled one to wind down instead of racing on compiler.language
+        self._job_lock = threading.Lock()
+        self.builds = 0
+        self.cancelled = 0
+
+    def submit(self, code, language, on_done):
+        """
+        Checks (and for C++/Java builds) code in the background, then calls
+        on_done(diagnostics) from the worker thread. on_done isn't called
+        if the job gets cancelled.
+        """
+        cancel = threading.Event()
+        with self._lock:
+            if self._cancel:
+                self._cancel.set()
+            self._cancel = cancel
+        threading.Thread(target=self._run, args=(code, language, cancel, on_done), daemon=True,
+                         name="speculative-build").start()
+
+    def cancel(self):
+        with self._lock:
+            if self._cancel:
+                self._cancel.set()
+            self._cancel = None
+
+    def _run(self, code, language, cancel, on_done):
+        with self._job_lock:
+            if cancel.is_set():
+                self.cancelled += 1
+                return
+            self.compiler.language = language
+            try:
+                diagnostics = check_syntax(self.compiler, code, cancel)
+                if language in Compiler.TOOLCHAIN and not any(d.severity == "error" for d in diagnostics):
+                    _, error = self.compiler.build(code, cancel)
+                    self.builds += 1
+                    if error:
+                        diagnostics = parse_diagnostics(error)
+            except BuildCancelled:
+                self.cancelled += 1
+                return
+            except BuildTimedOut as e:
+                diagnostics = [Diagnostic(1, 0, "warning", f"Background check stopped: {e}")]
+            except OSError as e:  # toolchain missing
+                diagnostics = [Diagnostic(1, 0, "warning", f"Background check unavailable: {e}")]
+        if not cancel.is_set():
+            on_done(diagnostics)
@@ -0,0 +1,204 @@
+"""
+Seeded generators for common DSA inputs.
+
+Every generator returns a StreamInput: the text is produced in ~64 KB chunks
+while it is being written into the program's stdin, so a 1e7-element array
+never exists as one Python string. The same (size, seed) always produces the
+same input, and a StreamInput can be replayed for repeated runs.
+
+Formats (1-based vertices):
+    random_array / sorted_array / reversed_array:  n, then the n integers on one line
+    tree:            n, then n-1 lines "u v"
+    dag:             n m, then m lines "u v" (every edge respects one hidden topological order)
+    grid:            r c, then r rows of '.' (open) and '#' (wall)
+    weighted_graph:  n m, then m lines "u v w"; connected, undirected
+"""
+import random
+
+from compiler.process import StreamInput
+
+CHUNK_CHARS = 64 * 1024
+
+
+def _chunked(lines):
+    """Joins an iterable of lines (without newlines) into ~CHUNK_CHARS strings."""
+    buf = []
+    size = 0
+    for line in lines:
+        if isinstance(line, _Row):
+            yield from _row_chunks(buf, line)
+            buf = []
+            size = 0
+            continue
+        buf.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_CHARS:
+            yield "\n".join(buf) + "\n"
+            buf = []
+            size = 0
+    if buf:
+        yield "\n".join(buf) + "\n"
+
+
+def _row_chunks(pending, row):
+    """Flushes pending lines, then streams row's values as one line."""
+    head = "\n".join(pending) + "\n" if pending else ""
+    batch = []
+    first = True
+    for v in row.values:
+        batch.append(str(v))
+        if len(batch) == row.batch:
+            yield head + ("" if first else " ") + " ".join(batch)
+            head, batch, first = "", [], False
+    yield head + ("" if first or not batch else " ") + " ".join(batch) + "\n"
+
+
+class _Row:
+    """A very long line produced in pieces; _chunked must not add newlines inside it."""
+
+    def __init__(self, values, batch=4096):
+        self.values = values
+        self.batch = batch
+
+
+def _numbers(values):
+    """All values on one space-separated line, generated lazily."""
+    return _Row(values)
+
+
+def _streamed(gen):
+    def make(*args, **kwargs):
+        call = ", ".join([*map(repr, args), *(f"{k}={v!r}" for k, v in kwargs.items())])
+        return StreamInput(lambda: _chunked(gen(*args, **kwargs)), name=f"{gen.__name__}({call})")
+    make.__name__ = gen.__name__
+    make.__doc__ = gen.__doc__
+    return make
+
+
+# ---------------- Arrays -----------------
+@_streamed
+def random_array(n, seed=0, lo=-10 ** 9, hi=10 ** 9):
+    """n random integers in [lo, hi]."""
+    rng = random.Random(seed)
+    yield str(n)
+    yield _numbers(rng.randint(lo, hi) for _ in range(n))
+
+
+@_streamed
+def sorted_array(n, seed=0, lo=-10 ** 9, hi=10 ** 9):
+    """n integers in non-decreasing order."""
+    # Sorted uniform values via cumulative gaps, without sorting n numbers in memory
+    rng = random.Random(seed)
+    yield str(n)
+    step = max(1, (hi - lo) // max(n, 1))
+    yield _numbers(_ascending(rng, n, lo, hi, step))
+
+
+@_streamed
+def reversed_array(n, seed=0, lo=-10 ** 9, hi=10 ** 9):
+    """n integers in non-increasing order."""
+    rng = random.Random(seed)
+    yield str(n)
+    step = max(1, (hi - lo) // max(n, 1))
+    yield _numbers(hi - (v - lo) for v in _ascending(rng, n, lo, hi, step))
+
+
+def _ascending(rng, n, lo, hi, step):
+    value = lo
+    for _ in range(n):
+        yield min(value, hi)
+        value += rng.randint(0, 2 * step - 1) if step > 1 else rng.randint(0, 1)
+
+
+# ---------------- Graphs -----------------
+def _labels(rng, n):
+    """Random relabelling so vertex 1 isn't always the root / source."""
+    labels = list(range(1, n + 1))
+    rng.shuffle(labels)
+    return labels
+
+
+@_streamed
+def tree(n, seed=0):
+    """Random tree on n vertices (each vertex hangs off a random earlier one)."""
+    rng = random.Random(seed)
+    label = _labels(rng, n)
+    yield str(n)
+    for i in range(1, n):
+        yield f"{label[rng.randrange(i)]} {label[i]}"
+
+
+@_streamed
+def dag(n, m=None, seed=0):
+    """Random DAG with n vertices and m edges (default 2n); no self-loops."""
+    rng = random.Random(seed)
+    m = min(2 * n if m is None else m, n * (n - 1) // 2)
+    label = _labels(rng, n)
+    yield f"{n} {m}"
+    seen = set() if m <= 1_000_000 else None  # dedupe unless that would be huge
+    emitted = 0
+    while emitted < m:
+        a, b = rng.randrange(n), rng.randrange(n)
+        if a == b:
+            continue
+        if a > b:
+            a, b = b, a
+        if seen is not None:
+            if (a, b) in seen:
+                continue
+            seen.add((a, b))
+        emitted += 1
+        yield f"{label[a]} {label[b]}"
+
+
+@_streamed
+def grid(rows, cols=None, seed=0, wall_ratio=0.2):
+    """rows x cols grid of open cells and walls; the corners are always open."""
+    rng = random.Random(seed)
+    cols = cols or rows
+    yield f"{rows} {cols}"
+    for r in range(rows):
+        row = ["#" if rng.random() < wall_ratio else "." for _ in range(cols)]
+        if r in (0, rows - 1):
+            row[0] = row[-1] = "."
+        yield "".join(row)
+
+
+@_streamed
+def weighted_graph(n, m=None, seed=0, max_weight=10 ** 9):
+    """
+    Connected undirected graph: a random spanning tree plus m-(n-1) extra
+    edges. No self-loops and no parallel edges.
+    """
+    rng = random.Random(seed)
+    m = min(max(n - 1, 2 * n if m is None else m), n * (n - 1) // 2) if n > 1 else 0
+    label = _labels(rng, n)
+    yield f"{n} {m}"
+    seen = set()  # edges emitted so far, as min(a, b) * n + max(a, b)
+    for i in range(1, n):
+        a = rng.randrange(i)
+        seen.add(a * n + i)
+        yield f"{label[a]} {label[i]} {rng.randint(1, max_weight)}"
+    emitted = n - 1
+    while emitted < m:
+        a = rng.randrange(n)
+        b = rng.randrange(n - 1)
+        b += b >= a  # any vertex but a
+        if a > b:
+            a, b = b, a
+        if a * n + b in seen:
+            continue
+        seen.add(a * n + b)
+        emitted += 1
+        yield f"{label[a]} {label[b]} {rng.randint(1, max_weight)}"
+
+
+GENERATORS = {
+    "Random array": random_array,
+    "Sorted array": sorted_array,
+    "Reversed array": reversed_array,
+    "Tree": tree,
+    "DAG": dag,
+    "Grid": grid,
+    "Weighted graph": weighted_graph,
+}
@@ -0,0 +1,146 @@
+"""
+Batch judging: compile a submission once, then run it against many test cases.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from enum import Enum
+
+from compiler.comp import Compiler, BuildCancelled, BuildTimedOut
+
+CASE_SEPARATOR = "==="
+OUTPUT_SEPARATOR = "---"
+
+
+class Verdict(Enum):
+    AC = "Accepted"
+    WA = "Wrong Answer"
+    TLE = "Time Limit Exceeded"
+    RE = "Runtime Error"
+    CE = "Compile Error"
+
+
+@dataclass
+class CaseResult:
+    index: int
+    verdict: Verdict
+    wall_time: float
+    exit_code: int
+    stdout: str = ""
+    stderr: str = ""
+    peak_rss_kb: int = None
+
+
+@dataclass
+class JudgeReport:
+    verdict: Verdict
+    cases: list = field(default_factory=list)
+    total_cases: int = 0
+    compile_error: str = ""
+
+    @property
+    def passed(self):
+        return sum(1 for c in self.cases if c.verdict == Verdict.AC)
+
+    def summary(self):
+        if self.verdict == Verdict.CE:
+            return self.compile_error
+        return f"{self.verdict.value}: {self.passed}/{self.total_cases} test cases passed."
+
+
+def outputs_match(actual, expected):
+    """Compares outputs ignoring trailing whitespace on lines and at the end."""
+    def norm(text):
+        return [line.rstrip() for line in text.rstrip().splitlines()]
+    return norm(actual) == norm(expected)
+
+
+def parse_cases(text):
+    """
+    Parses test cases written as:
+
+        <input>
+        ---
+        <expected output>
+        ===
+        <input>
+        ---
+        <expected output>
+
+    Returns a list of (input, expected_output) pairs.
+    """
+    cases = []
+    block = []
+    for line in text.splitlines() + [CASE_SEPARATOR]:
+        if line.strip() == CASE_SEPARATOR:
+            lines = block
+            block = []
+            if not any(l.strip() for l in lines):
+                continue
+            seps = [i for i, l in enumerate(lines) if l.strip() == OUTPUT_SEPARATOR]
+            if not seps:
+                continue
+            cut = seps[0]
+            cases.append(("\n".join(lines[:cut]) + "\n", "\n".join(lines[cut + 1:])))
+        else:
+            block.append(line)
+    return cases
+
+
+def _judge_case(program, index, user_input, expected, timeout, max_output_bytes):
+    result = program.execute(user_input, timeout=timeout, max_output_bytes=max_output_bytes)
+    if result.timed_out:
+        verdict = Verdict.TLE
+    elif result.returncode != 0:
+        verdict = Verdict.RE
+    elif outputs_match(result.stdout, expected):
+        verdict = Verdict.AC
+    else:
+        verdict = Verdict.WA
+    return CaseResult(index, verdict, result.wall_time, result.returncode, result.stdout, result.stderr,
+                      result.peak_rss_kb)
+
+
+def judge(code, language, cases, workers=4, stop_on_first_failure=False, timeout=None, compiler=None):
+    """
+    Runs code against cases, a list of (input, expected_output) pairs.
+
+    The submission is compiled once and the cases are spread over `workers`
+    concurrent child processes. With stop_on_first_failure, cases that haven't
+    started yet are dropped as soon as one case fails.
+    """
+    compiler = compiler or Compiler(language)
+    timeout = timeout or compiler.RUN_TIMEOUT
+
+    try:
+        program, error = compiler.prepare(code, language=language)
+    except (BuildCancelled, BuildTimedOut) as e:
+        program, error = None, str(e) or "Build cancelled."
+    if error:
+        return JudgeReport(Verdict.CE, total_cases=len(cases), compile_error=error)
+
+    if program.python_pool:
+        # More threads than warm workers would only queue, and skew wall times
+        workers = min(workers, program.python_pool.size)
+
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [
+                pool.submit(_judge_case, program, i, user_input, expected, timeout, compiler.MAX_OUTPUT_BYTES)
+                for i, (user_input, expected) in enumerate(cases)
+            ]
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                result = future.result()
+                results.append(result)
+                if stop_on_first_failure and result.verdict != Verdict.AC:
+                    for f in futures:
+                        f.cancel()
+    finally:
+        program.close()
+
+    results.sort(key=lambda c: c.index)
+    failed = [c for c in results if c.verdict != Verdict.AC]
+    verdict = failed[0].verdict if failed else Verdict.AC
+    return JudgeReport(verdict, results, total_cases=len(cases))
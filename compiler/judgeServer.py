@@ -0,0 +1,294 @@
+"""
+Local judge service: one machine compiles and runs submissions for a classroom.
+
+Start it with:
+
+    python -m compiler.judgeServer --port 8765 --workers 4
+
+Editors then use RemoteCompiler (or set DSA_ARCADE_JUDGE_URL) instead of
+compiling in-process. Submissions are queued per user and served round-robin,
+so one learner hammering Run can't starve the rest of the room. Each job runs
+in its own child process (or warm Python worker) under one of `workers` worker
+threads.
+
+Threads rather than a process pool: the work itself never runs in this
+process. A worker thread only compiles, spawns and waits on a child (blocking
+calls that release the GIL), so `workers` threads keep `workers` children busy
+and the machine saturated, while each submission gets a fresh process, limits
+and process group of its own. A crash or kill takes down that child, not the
+server.
+
+Endpoints (JSON in, JSON out):
+    POST /run    {"user", "language", "code", "input"}
+    POST /judge  {"user", "language", "code", "cases": [[input, expected], ...], "stop_on_first_failure",
+                  "timeout" (per case, seconds; optional, at most MAX_CASE_TIMEOUT)}
+    GET  /stats
+"""
+import argparse
+import collections
+import getpass
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from compiler.comp import Compiler
+from compiler.judge import judge, JudgeReport, CaseResult, Verdict
+from compiler.process import ProcessResult, input_text
+from compiler.runResult import RunResult, StageTimings
+
+DEFAULT_PORT = 8765
+# Longest per-case time limit a client may ask /judge for
+MAX_CASE_TIMEOUT = 30
+
+
+class QueueFull(Exception):
+    pass
+
+
+class FairQueue:
+    """
+    Per-user FIFO queues served round-robin: each get() takes the oldest job of
+    the next user in line, then moves that user to the back.
+    """
+
+    def __init__(self, max_per_user=20):
+        self.max_per_user = max_per_user
+        self._queues = collections.OrderedDict()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, user, job):
+        with self._cond:
+            q = self._queues.setdefault(user, collections.deque())
+            if len(q) >= self.max_per_user:
+                raise QueueFull(f"{user} already has {len(q)} submissions waiting.")
+            q.append(job)
+            self._cond.notify()
+
+    def get(self):
+        """Blocks for the next job; returns None once closed."""
+        with self._cond:
+            while not self._queues and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            user, q = next(iter(self._queues.items()))
+            job = q.popleft()
+            del self._queues[user]
+            if q:
+                self._queues[user] = q  # back of the line
+            return job
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def depth(self):
+        with self._cond:
+            return {user: len(q) for user, q in self._queues.items()}
+
+
+def report_to_dict(report):
+    return {
+        "verdict": report.verdict.name,
+        "total_cases": report.total_cases,
+        "compile_error": report.compile_error,
+        "cases": [{**asdict(c), "verdict": c.verdict.name} for c in report.cases],
+    }
+
+
+def report_from_dict(data):
+    cases = [CaseResult(**{**c, "verdict": Verdict[c["verdict"]]}) for c in data["cases"]]
+    return JudgeReport(Verdict[data["verdict"]], cases, data["total_cases"], data["compile_error"])
+
+
+class JudgeService:
+    def __init__(self, workers=4, max_per_user=20):
+        self.queue = FairQueue(max_per_user)
+        self.completed = 0
+        self._lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._work, daemon=True, name=f"judge-{i}")
+                         for i in range(workers)]
+        for t in self._workers:
+            t.start()
+
+    def _work(self):
+        compiler = Compiler()
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            kind, payload, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                compiler.language = payload["language"]
+                if kind == "run":
+                    result, error = compiler.execute(payload["code"], payload.get("input", ""))
+                    future.set_result({"result": asdict(result) if result else None, "error": error})
+                else:
+                    timeout = payload.get("timeout")
+                    report = judge(payload["code"], payload["language"], payload["cases"],
+                                   workers=1, stop_on_first_failure=payload.get("stop_on_first_failure", False),
+                                   timeout=min(float(timeout), MAX_CASE_TIMEOUT) if timeout else None,
+                                   compiler=compiler)
+                    future.set_result(report_to_dict(report))
+            except Exception as e:
+                future.set_exception(e)
+            with self._lock:
+                self.completed += 1
+
+    def submit(self, kind, payload):
+        future = Future()
+        self.queue.put(payload.get("user", "anonymous"), (kind, payload, future))
+        return future
+
+    def stats(self):
+        return {"queued": self.queue.depth(), "completed": self.completed, "workers": len(self._workers)}
+
+    def shutdown(self):
+        self.queue.close()
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._reply(200, service.stats())
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            kind = self.path.strip("/")
+            if kind not in ("run", "judge"):
+                self._reply(404, {"error": "not found"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if not isinstance(payload, dict):
+                    raise ValueError("Request body must be a JSON object.")
+                if payload.get("language") not in Compiler.LANG_EXT:
+                    raise ValueError(f"Language {payload.get('language')} not supported.")
+                future = service.submit(kind, payload)
+            except QueueFull as e:
+                self._reply(429, {"error": str(e)})
+                return
+            except (ValueError, KeyError) as e:
+                self._reply(400, {"error": str(e)})
+                return
+            try:
+                self._reply(200, future.result())
+            except Exception as e:
+                self._reply(500, {"error": f"Error: {e}"})
+
+        def log_message(self, format, *args):
+            pass  # keep the console quiet; /stats has the numbers
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, workers=4, max_per_user=20):
+    """Creates the server; call serve_forever() on it (or shutdown() to stop)."""
+    service = JudgeService(workers, max_per_user)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+# ---------------- Client -----------------
+class RemoteCompiler:
+    """
+    Drop-in for Compiler.execute/run_code that sends work to a judge server.
+    Output arrives in one piece when the run finishes.
+    """
+    MAX_OUTPUT_BYTES = Compiler.MAX_OUTPUT_BYTES
+
+    def __init__(self, url=f"http://127.0.0.1:{DEFAULT_PORT}", language="Python", user=None, timeout=120):
+        self.url = url.rstrip("/")
+        self.language = language
+        self.user = user or f"{getpass.getuser()}@{socket.gethostname()}"
+        self.timeout = timeout
+
+    def _post(self, path, payload):
+        body = json.dumps({"user": self.user, "language": self.language, **payload}).encode()
+        request = urllib.request.Request(self.url + path, body, {"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(json.loads(e.read() or b"{}").get("error", str(e)))
+
+    def execute(self, code, user_input="", on_output=None, max_output_bytes=None, cancel=None):
+        """
+        Runs code on the server. cancel is accepted for parity with Compiler, but
+        a run already sent can't be stopped; a cancelled one reports so on return.
+        """
+        try:
+            reply = self._post("/run", {"code": code, "input": input_text(user_input)})
+        except (OSError, RuntimeError) as e:
+            return None, f"Judge server error: {e}"
+        if reply["error"]:
+            return None, reply["error"]
+        result = ProcessResult(**reply["result"])
+        if cancel is not None and cancel.is_set():
+            result.cancelled = True
+            return result, None
+        if on_output:
+            for stream in ("stdout", "stderr"):
+                if getattr(result, stream):
+                    on_output(stream, getattr(result, stream))
+        return result, None
+
+    def run_code(self, code, user_input="", on_output=None, max_output_bytes=None, cancel=None):
+        """RunResult for a remote run; only spawn/execute are timed (server side)."""
+        result, error = self.execute(code, user_input, on_output, max_output_bytes, cancel)
+        if error:
+            return RunResult.failed(error)
+        timings = StageTimings()
+        timings.add_process(result)
+        return RunResult.of(result, timings)
+
+    def judge(self, code, cases, stop_on_first_failure=False, timeout=None, language=None):
+        """Judges on the server; timeout is the per-case limit (server default when None)."""
+        reply = self._post("/judge", {"code": code, "cases": [list(c) for c in cases],
+                                      "stop_on_first_failure": stop_on_first_failure, "timeout": timeout,
+                                      "language": language or self.language})
+        return report_from_dict(reply)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DSA-Arcade local judge server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-per-user", type=int, default=20)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.workers, args.max_per_user)
+    print(f"Judge server listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.service.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
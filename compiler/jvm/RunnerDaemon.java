@@ -0,0 +1,278 @@
+import javax.tools.*;
+import java.io.*;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.*;
+import java.nio.charset.StandardCharsets;
+import java.security.MessageDigest;
+import java.util.*;
+
+/**
+ * Long-lived JVM that compiles and runs Java submissions for DSA-Arcade.
+ *
+ * Started by compiler/jvmDaemon.py with `java RunnerDaemon.java`. It listens on
+ * an ephemeral loopback port, prints "PORT <n>" on stdout and exits when its
+ * stdin is closed (i.e. when the Python side goes away).
+ *
+ * Request:  int codeLen, code bytes, int inputLen, input bytes, int timeoutMs,
+ *           int maxOutputBytes (stdout + stderr; 0 for no limit)
+ * Response: int status (0 ok, 1 compile error, 2 timeout, 3 output limit), int exitCode,
+ *           int stdoutLen, stdout bytes, int stderrLen, stderr bytes
+ *
+ * Sources are compiled in memory through javax.tools and every run loads Main
+ * in a fresh classloader, so static state never leaks between runs. Runs are
+ * served one at a time because System.in/out are process-wide. Output beyond
+ * maxOutputBytes is dropped and ends the run, like a timeout: a thread stuck
+ * in a print loop can't be stopped safely, so the daemon exits after replying
+ * and the client starts a new one.
+ */
+public class RunnerDaemon {
+    static final int OK = 0, COMPILE_ERROR = 1, TIMEOUT = 2, OUTPUT_LIMIT = 3;
+    static final long POLL_MS = 50;
+    static final int MAX_CACHED = 64;
+
+    static final JavaCompiler COMPILER = ToolProvider.getSystemJavaCompiler();
+    static final Map<String, Map<String, byte[]>> CLASS_CACHE =
+        new LinkedHashMap<String, Map<String, byte[]>>(16, 0.75f, true) {
+            protected boolean removeEldestEntry(Map.Entry<String, Map<String, byte[]>> e) {
+                return size() > MAX_CACHED;
+            }
+        };
+
+    public static void main(String[] args) throws Exception {
+        if (COMPILER == null) {
+            System.out.println("ERROR no system Java compiler (is this a JRE?)");
+            System.exit(2);
+        }
+        final InputStream parentIn = System.in;
+        final PrintStream realOut = System.out;
+
+        Thread watchdog = new Thread(() -> {
+            try {
+                while (parentIn.read() != -1) { }
+            } catch (IOException ignored) { }
+            System.exit(0);
+        });
+        watchdog.setDaemon(true);
+        watchdog.start();
+
+        try (ServerSocket server = new ServerSocket(0, 50, InetAddress.getLoopbackAddress())) {
+            realOut.println("PORT " + server.getLocalPort());
+            realOut.flush();
+            while (true) {
+                try (Socket sock = server.accept()) {
+                    handle(sock, realOut);
+                } catch (IOException e) {
+                    // Client hung up mid-request; keep serving
+                }
+            }
+        }
+    }
+
+    static void handle(Socket sock, PrintStream realOut) throws IOException {
+        DataInputStream in = new DataInputStream(new BufferedInputStream(sock.getInputStream()));
+        DataOutputStream out = new DataOutputStream(new BufferedOutputStream(sock.getOutputStream()));
+
+        String code = new String(readBytes(in), StandardCharsets.UTF_8);
+        byte[] input = readBytes(in);
+        int timeoutMs = in.readInt();
+        int maxOutput = in.readInt();
+
+        ByteArrayOutputStream diagnostics = new ByteArrayOutputStream();
+        Map<String, byte[]> classes = compile(code, diagnostics);
+        if (classes == null) {
+            reply(out, COMPILE_ERROR, 1, new byte[0], diagnostics.toByteArray());
+            return;
+        }
+
+        OutputCap cap = new OutputCap(maxOutput > 0 ? maxOutput : Long.MAX_VALUE);
+        CappedOutput stdout = new CappedOutput(cap);
+        CappedOutput stderr = new CappedOutput(cap);
+        InputStream savedIn = System.in;
+        PrintStream savedOut = System.out, savedErr = System.err;
+        PrintStream runOut = new PrintStream(stdout, true, "UTF-8");
+        PrintStream runErr = new PrintStream(stderr, true, "UTF-8");
+        int[] exitCode = {0};
+
+        System.setIn(new ByteArrayInputStream(input));
+        System.setOut(runOut);
+        System.setErr(runErr);
+        Thread runner = new Thread(() -> exitCode[0] = invokeMain(classes, runErr), "main");
+        runner.setDaemon(true);
+        boolean timedOut;
+        try {
+            runner.start();
+            // Wake up every POLL_MS so a run that hits the output cap is stopped right away
+            long deadline = System.currentTimeMillis() + timeoutMs;
+            long left;
+            while (runner.isAlive() && !cap.hit() && (left = deadline - System.currentTimeMillis()) > 0) {
+                runner.join(Math.min(left, POLL_MS));
+            }
+            timedOut = runner.isAlive() && !cap.hit();
+        } catch (InterruptedException e) {
+            timedOut = true;
+        } finally {
+            runOut.flush();
+            runErr.flush();
+            System.setIn(savedIn);
+            System.setOut(savedOut);
+            System.setErr(savedErr);
+        }
+
+        if (timedOut || cap.hit()) {
+            reply(out, timedOut ? TIMEOUT : OUTPUT_LIMIT, 1, stdout.toByteArray(), stderr.toByteArray());
+            // The runaway thread can't be stopped safely; let the client start a new daemon
+            System.exit(3);
+        }
+        reply(out, OK, exitCode[0], stdout.toByteArray(), stderr.toByteArray());
+    }
+
+    // ---------------- Output limit ----------------
+    /** Byte budget shared by a run's stdout and stderr. */
+    static class OutputCap {
+        private long remaining;
+        private volatile boolean hit;
+
+        OutputCap(long maxBytes) {
+            remaining = maxBytes;
+        }
+
+        /** How many of len bytes may still be kept; marks the cap as hit when that's fewer. */
+        synchronized int take(int len) {
+            int n = (int) Math.min(len, remaining);
+            remaining -= n;
+            if (n < len) hit = true;
+            return n;
+        }
+
+        boolean hit() {
+            return hit;
+        }
+    }
+
+    /** Buffers output up to the shared cap and silently drops the rest. */
+    static class CappedOutput extends ByteArrayOutputStream {
+        private final OutputCap cap;
+
+        CappedOutput(OutputCap cap) {
+            this.cap = cap;
+        }
+
+        @Override
+        public synchronized void write(int b) {
+            if (cap.take(1) == 1) super.write(b);
+        }
+
+        @Override
+        public synchronized void write(byte[] b, int off, int len) {
+            int n = cap.take(len);
+            if (n > 0) super.write(b, off, n);
+        }
+    }
+
+    static int invokeMain(Map<String, byte[]> classes, PrintStream err) {
+        try {
+            ClassLoader loader = new MemoryClassLoader(classes, ClassLoader.getPlatformClassLoader());
+            Method main = loader.loadClass("Main").getMethod("main", String[].class);
+            main.invoke(null, (Object) new String[0]);
+            return 0;
+        } catch (InvocationTargetException e) {
+            err.print("Exception in thread \"main\" ");
+            e.getCause().printStackTrace(err);
+        } catch (ReflectiveOperationException e) {
+            err.println("Error: Main class with public static void main(String[]) not found");
+        }
+        return 1;
+    }
+
+    // ---------------- In-memory compilation ----------------
+    static Map<String, byte[]> compile(String code, OutputStream diagnostics) {
+        String key = sha256(code);
+        synchronized (CLASS_CACHE) {
+            Map<String, byte[]> cached = CLASS_CACHE.get(key);
+            if (cached != null) return cached;
+        }
+
+        Map<String, byte[]> classes = new HashMap<>();
+        StandardJavaFileManager std = COMPILER.getStandardFileManager(null, null, StandardCharsets.UTF_8);
+        JavaFileManager fm = new ForwardingJavaFileManager<JavaFileManager>(std) {
+            @Override
+            public JavaFileObject getJavaFileForOutput(Location location, String className,
+                                                       JavaFileObject.Kind kind, FileObject sibling) {
+                return new SimpleJavaFileObject(URI.create("mem:///" + className.replace('.', '/') + kind.extension), kind) {
+                    @Override
+                    public OutputStream openOutputStream() {
+                        return new ByteArrayOutputStream() {
+                            @Override
+                            public void close() {
+                                classes.put(className, toByteArray());
+                            }
+                        };
+                    }
+                };
+            }
+        };
+        JavaFileObject source = new SimpleJavaFileObject(URI.create("string:///Main.java"), JavaFileObject.Kind.SOURCE) {
+            @Override
+            public CharSequence getCharContent(boolean ignoreEncodingErrors) {
+                return code;
+            }
+        };
+
+        Writer diagWriter = new OutputStreamWriter(diagnostics, StandardCharsets.UTF_8);
+        boolean ok = COMPILER.getTask(diagWriter, fm, null, null, null, List.of(source)).call();
+        try {
+            diagWriter.flush();
+        } catch (IOException ignored) { }
+        if (!ok) return null;
+
+        synchronized (CLASS_CACHE) {
+            CLASS_CACHE.put(key, classes);
+        }
+        return classes;
+    }
+
+    static class MemoryClassLoader extends ClassLoader {
+        private final Map<String, byte[]> classes;
+
+        MemoryClassLoader(Map<String, byte[]> classes, ClassLoader parent) {
+            super(parent);
+            this.classes = classes;
+        }
+
+        @Override
+        protected Class<?> findClass(String name) throws ClassNotFoundException {
+            byte[] bytes = classes.get(name);
+            if (bytes == null) throw new ClassNotFoundException(name);
+            return defineClass(name, bytes, 0, bytes.length);
+        }
+    }
+
+    // ---------------- Wire helpers ----------------
+    static byte[] readBytes(DataInputStream in) throws IOException {
+        byte[] data = new byte[in.readInt()];
+        in.readFully(data);
+        return data;
+    }
+
+    static void reply(DataOutputStream out, int status, int exitCode, byte[] stdout, byte[] stderr) throws IOException {
+        out.writeInt(status);
+        out.writeInt(exitCode);
+        out.writeInt(stdout.length);
+        out.write(stdout);
+        out.writeInt(stderr.length);
+        out.write(stderr);
+        out.flush();
+    }
+
+    static String sha256(String s) {
+        try {
+            byte[] digest = MessageDigest.getInstance("SHA-256").digest(s.getBytes(StandardCharsets.UTF_8));
+            StringBuilder sb = new StringBuilder();
+            for (byte b : digest) sb.append(String.format("%02x", b));
+            return sb.toString();
+        } catch (Exception e) {
+            return Integer.toHexString(s.hashCode());
+        }
+    }
+}
@@ -0,0 +1,167 @@
+"""
+Client for the persistent JVM runner (compiler/jvm/RunnerDaemon.java).
+
+Instead of paying for a `javac` JVM and a `java` JVM on every Run, one JVM stays
+up, compiles in memory via javax.tools and runs Main.main in a fresh
+classloader. Compiler only uses it when asked to (use_jvm_daemon; the editor
+turns it on with DSA_ARCADE_JVM_DAEMON=1) and falls back to the javac/java
+subprocess path whenever the daemon can't be started or dies.
+
+Submissions in the daemon are not isolated from it or from each other: there
+is no SecurityManager, so the accepts() check for exit calls is only a cheap
+pre-filter and a determined submission can still halt the JVM, leave threads
+running or change shared state. A daemon that goes away mid-run is reaped and
+the run is repeated on the subprocess path; the next run starts a new
+daemon. Only enable it for your own code, never on a shared judge server.
+"""
+import os
+import shutil
+import socket
+import struct
+import subprocess
+import threading
+import time
+
+from compiler.process import OutputCollector, ProcessResult
+
+DAEMON_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jvm", "RunnerDaemon.java")
+
+STATUS_OK = 0
+STATUS_COMPILE_ERROR = 1
+STATUS_TIMEOUT = 2
+STATUS_OUTPUT_LIMIT = 3
+
+# Submissions that visibly take the whole JVM down go through the subprocess
+# path up front; anything that gets past this is caught when the daemon dies
+_UNSAFE_CALLS = ("System.exit", "Runtime.getRuntime().halt", "Runtime.getRuntime().exit")
+
+_INT = struct.Struct(">i")
+
+
+class JvmDaemonUnavailable(Exception):
+    pass
+
+
+class JavaCompileError(Exception):
+    pass
+
+
+def _recv_exact(sock, n):
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise JvmDaemonUnavailable("JVM daemon closed the connection.")
+        data += chunk
+    return data
+
+
+def _recv_int(sock):
+    return _INT.unpack(_recv_exact(sock, _INT.size))[0]
+
+
+class JvmDaemon:
+    def __init__(self, java="java", startup_timeout=30):
+        self.java = java
+        self.startup_timeout = startup_timeout
+        self.proc = None
+        self.port = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        return shutil.which(self.java) is not None and os.path.exists(DAEMON_SRC)
+
+    @staticmethod
+    def accepts(code):
+        return not any(call in code for call in _UNSAFE_CALLS)
+
+    # ---------------- Lifecycle -----------------
+    def start(self):
+        """Starts the daemon if needed. Raises JvmDaemonUnavailable on failure."""
+        with self._lock:
+            if self.proc and self.proc.poll() is None:
+                return
+            if not self.available():
+                raise JvmDaemonUnavailable("java not found.")
+
+            proc = subprocess.Popen(
+                [self.java, "-Xshare:auto", DAEMON_SRC],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            )
+            first_line = []
+            reader = threading.Thread(target=lambda: first_line.append(proc.stdout.readline()), daemon=True)
+            reader.start()
+            reader.join(self.startup_timeout)
+            line = first_line[0].strip() if first_line else ""
+            if not line.startswith("PORT "):
+                proc.kill()
+                proc.wait()
+                raise JvmDaemonUnavailable(line or "JVM daemon did not start.")
+            self.proc = proc
+            self.port = int(line.split()[1])
+
+    def stop(self):
+        with self._lock:
+            if self.proc:
+                try:
+                    self.proc.stdin.close()  # daemon exits when its stdin closes
+                    self.proc.wait(timeout=2)
+                except (OSError, subprocess.TimeoutExpired):
+                    self.proc.kill()
+                self.proc = None
+
+    # ---------------- Run -----------------
+    def run(self, code, user_input="", timeout=5, on_output=None, max_output_bytes=None):
+        """
+        Compiles and runs code in the daemon and returns a ProcessResult. Output
+        arrives in one piece when the run ends; the daemon itself stops a run
+        at max_output_bytes, so it never buffers more. Compile errors raise
+        JavaCompileError; a missing or crashed daemon raises JvmDaemonUnavailable
+        so the caller can fall back.
+        """
+        self.start()
+        start = time.perf_counter()
+        payload = code.encode()
+        stdin = user_input.encode()
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=timeout + 30) as sock:
+                sock.sendall(_INT.pack(len(payload)) + payload + _INT.pack(len(stdin)) + stdin
+                             + _INT.pack(int(timeout * 1000)) + _INT.pack(min(max_output_bytes or 0, 2 ** 31 - 1)))
+                status = _recv_int(sock)
+                exit_code = _recv_int(sock)
+                stdout = _recv_exact(sock, _recv_int(sock))
+                stderr = _recv_exact(sock, _recv_int(sock))
+        except (OSError, JvmDaemonUnavailable) as e:
+            self.stop()  # e.g. the submission halted the JVM; reap it so the next run starts afresh
+            raise JvmDaemonUnavailable(str(e))
+
+        if status == STATUS_COMPILE_ERROR:
+            raise JavaCompileError(stderr.decode(errors="replace"))
+        if status in (STATUS_TIMEOUT, STATUS_OUTPUT_LIMIT):
+            self.stop()  # the daemon exits after a runaway run; reap it
+
+        collector = OutputCollector(max_output_bytes, on_output)
+        collector.feed("stdout", stdout, final=True)
+        collector.feed("stderr", stderr, final=True)
+        return ProcessResult(
+            stdout=collector.text("stdout"),
+            stderr=collector.text("stderr"),
+            returncode=exit_code,
+            timed_out=status == STATUS_TIMEOUT,
+            truncated=collector.truncated or status == STATUS_OUTPUT_LIMIT,
+            wall_time=time.perf_counter() - start,
+        )
+
+
+_shared_daemon = None
+_shared_lock = threading.Lock()
+
+
+def shared_jvm_daemon():
+    global _shared_daemon
+    with _shared_lock:
+        if _shared_daemon is None:
+            import atexit
+            _shared_daemon = JvmDaemon()
+            atexit.register(_shared_daemon.stop)
+        return _shared_daemon
@@ -0,0 +1,310 @@
+"""
+Local per-problem leaderboard of accepted submissions.
+
+An accepted submission is scored separately from judging, since judge times
+are taken on tiny cases, several at once: score() builds it in release mode
+and times the largest test inputs, one run at a time, taking the median of
+repeated runs of each. Its runtime is the sum of those medians and its peak
+memory the highest peak RSS seen. Entries rank by runtime, then by peak
+memory (unmeasured last), then by who submitted first. Languages aren't compared with each other: each has its own
+ranking, and every entry is labelled with the toolchain and runner that timed
+it (e.g. "g++ -O2", "python -O, warm pool").
+
+Results go into an indexed SQLite database in WAL mode. record() only queues
+the result. A writer thread inserts queued results in batches, one
+transaction per batch, so neither the editor nor a judge thread ever waits
+on the database. Readers use their own connection, and WAL lets them read
+while a batch is being written. WAL needs shared memory between everyone
+using the file, so keep it on a local disk, not a network share.
+
+    python -m compiler.leaderboard two-sum
+"""
+import argparse
+import getpass
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from compiler.benchmark import benchmark
+from compiler.comp import Compiler
+from compiler.problemBank import default_data_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    problem TEXT NOT NULL,
+    user TEXT NOT NULL,
+    language TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    runtime REAL NOT NULL,
+    peak_rss_kb INTEGER,
+    submitted REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_rank ON scores (problem, language, runtime);
+CREATE INDEX IF NOT EXISTS scores_by_user ON scores (problem, language, user, runtime);
+"""
+
+# Ranking: median runtime, then peak memory (unmeasured last), then the earlier submission
+_RANK_ORDER = "runtime, peak_rss_kb IS NULL, peak_rss_kb, submitted"
+# Each user's best row under that order
+_BEST_PER_USER = ("SELECT user, language, mode, runtime, peak_rss_kb, submitted FROM"
+                  f" (SELECT *, row_number() OVER (PARTITION BY user ORDER BY {_RANK_ORDER}) AS pick FROM scores"
+                  "  WHERE problem = ? AND language = ?) WHERE pick = 1")
+
+# How accepted submissions are timed
+SCORED_CASES = 3  # the largest inputs; small ones mostly time process start-up
+SCORE_RUNS = 5
+# One scoring at a time, so its runs never compete with each other for the CPU
+_score_lock = threading.Lock()
+
+
+def current_user():
+    return f"{getpass.getuser()}@{socket.gethostname()}"
+
+
+def _format_memory(peak_rss_kb):
+    return f"{peak_rss_kb / 1024:.1f} MB" if peak_rss_kb is not None else "-"
+
+
+# ---------------- Scoring -----------------
+@dataclass
+class Score:
+    language: str
+    mode: str  # toolchain and runner that timed it, e.g. "g++ -O2"
+    runtime: float = None  # seconds: sum over the scored cases of their median wall time
+    peak_rss_kb: int = None
+    cases: int = 0
+    error: str = ""
+
+
+def score(code, language, cases, compiler=None, timeout=None, scored_cases=SCORED_CASES, runs=SCORE_RUNS):
+    """
+    Times an accepted submission for the leaderboard on the largest
+    `scored_cases` inputs of cases ([(input, expected output)]), each run
+    `runs` times after a warm-up. Returns a Score; error is set if a run
+    fails.
+    """
+    compiler = compiler or Compiler(language, release=True)
+    tool, flags = compiler.toolchain(language)
+    mode = " ".join([tool, *flags])
+    if language == "Python" and compiler.python_pool:
+        mode += ", warm pool"
+    result = Score(language, mode)
+    largest = sorted(cases, key=lambda case: len(case[0]), reverse=True)[:scored_cases]
+    with _score_lock:
+        for user_input, _ in largest:
+            report = benchmark(code, language, user_input, runs=runs, warmup=1, compiler=compiler, timeout=timeout)
+            if report.error:
+                result.error = report.error
+                return result
+            result.runtime = (result.runtime or 0.0) + report.wall.median
+            if report.peak_rss_kb is not None:
+                result.peak_rss_kb = max(result.peak_rss_kb or 0, report.peak_rss_kb)
+            result.cases += 1
+    return result
+
+
+# ---------------- Records -----------------
+@dataclass
+class Entry:
+    user: str
+    language: str
+    mode: str
+    runtime: float  # see Score.runtime
+    peak_rss_kb: int = None
+    submitted: float = None
+
+    def describe(self):
+        return f"{self.runtime * 1000:.1f} ms, {_format_memory(self.peak_rss_kb)} peak ({self.mode})"
+
+
+@dataclass
+class Standing:
+    problem: str
+    language: str
+    mine: Entry = None
+    best: Entry = None
+    rank: int = None
+    participants: int = 0
+
+    def summary(self):
+        """e.g. "C++ — yours: 12.1 ms, 9.3 MB peak (g++ -O2), #2 of 14 | best: 8.0 ms, 9.1 MB peak (g++ -O2) by ana@lab3"."""
+        if self.best is None:
+            return f"{self.language} — no accepted submissions yet."
+        mine = f"yours: {self.mine.describe()}, #{self.rank} of {self.participants}" if self.mine \
+            else "yours: not solved yet"
+        return f"{self.language} — {mine} | best: {self.best.describe()} by {self.best.user}"
+
+
+class Leaderboard:
+    def __init__(self, path=None, user=None, batch_size=64, flush_interval=0.5):
+        self.path = path or os.path.join(default_data_dir(), "leaderboard.db")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.user = user or current_user()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._writer = None
+        self._start_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._db = self._connect()
+        self._db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last batch is at risk on power loss
+        return db
+
+    # ---------------- Recording -----------------
+    def record(self, problem, score, user=None):
+        """
+        Queues a Score (see score()) for `problem` (a problem slug) and returns
+        at once; a failed score is ignored. Returns True if queued.
+        """
+        if score.error or score.runtime is None:
+            return False
+        self._ensure_writer()
+        self._queue.put((problem, user or self.user, score.language, score.mode, score.runtime,
+                         score.peak_rss_kb, time.time()))
+        return True
+
+    def flush(self, timeout=None):
+        """Blocks until everything recorded so far is committed. Don't call it on the Tk thread."""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        with self._read_lock:
+            self._db.close()
+
+    def _ensure_writer(self):
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="leaderboard-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        db = self._connect()
+        try:
+            running = True
+            while running:
+                batch, waiters = [], []
+                item = self._queue.get()
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is None:
+                        running = False
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        batch.append(item)
+                    # Commit now if asked to, when full, or after flush_interval; otherwise gather more
+                    if not running or waiters or len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                if batch:
+                    try:
+                        with db:
+                            db.executemany("INSERT INTO scores (problem, user, language, mode, runtime, peak_rss_kb,"
+                                           " submitted) VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+                    except sqlite3.Error as e:
+                        print(f"Leaderboard: dropped {len(batch)} results: {e}")
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            db.close()
+
+    # ---------------- Reading -----------------
+    def languages(self, problem):
+        """Languages with accepted submissions for `problem`; each is ranked on its own."""
+        with self._read_lock:
+            rows = self._db.execute("SELECT DISTINCT language FROM scores WHERE problem = ? ORDER BY language",
+                                    (problem,)).fetchall()
+        return [language for language, in rows]
+
+    def top(self, problem, language, limit=10):
+        """Each user's best score in `language`, fastest first (then least memory, then earliest)."""
+        with self._read_lock:
+            rows = self._db.execute(f"{_BEST_PER_USER} ORDER BY {_RANK_ORDER} LIMIT ?",
+                                    (problem, language, limit)).fetchall()
+        return [Entry(*row) for row in rows]
+
+    def best(self, problem, language, user=None):
+        """Best score in `language` of `user`, or of anyone when user is None."""
+        sql = ("SELECT user, language, mode, runtime, peak_rss_kb, submitted FROM scores"
+               " WHERE problem = ? AND language = ?")
+        params = [problem, language]
+        if user:
+            sql += " AND user = ?"
+            params.append(user)
+        with self._read_lock:
+            row = self._db.execute(f"{sql} ORDER BY {_RANK_ORDER} LIMIT 1", params).fetchone()
+        return Entry(*row) if row else None
+
+    def standing(self, problem, language, user=None):
+        """Your best vs the best in `language` on `problem`, with your rank among that language's users."""
+        user = user or self.user
+        standing = Standing(problem, language, self.best(problem, language, user), self.best(problem, language))
+        with self._read_lock:
+            standing.participants = self._db.execute(
+                "SELECT count(DISTINCT user) FROM scores WHERE problem = ? AND language = ?",
+                (problem, language)).fetchone()[0]
+            if standing.mine:
+                # Position in the same order top() lists, so equal runtimes aren't shown as a tie
+                standing.rank = self._db.execute(
+                    f"SELECT pos FROM (SELECT user, row_number() OVER (ORDER BY {_RANK_ORDER}) AS pos"
+                    f" FROM ({_BEST_PER_USER})) WHERE user = ?",
+                    (problem, language, user)).fetchone()[0]
+        return standing
+
+
+_shared_board = None
+_shared_lock = threading.Lock()
+
+
+def shared_leaderboard():
+    global _shared_board
+    with _shared_lock:
+        if _shared_board is None:
+            _shared_board = Leaderboard(os.environ.get("DSA_ARCADE_LEADERBOARD"))
+        return _shared_board
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the local leaderboard of a problem")
+    parser.add_argument("problem", help="problem slug")
+    parser.add_argument("--language", help="only this language (default: each one in turn)")
+    parser.add_argument("--db", help="leaderboard file (default: the shared one)")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    board = Leaderboard(args.db) if args.db else shared_leaderboard()
+    languages = [args.language] if args.language else board.languages(args.problem)
+    if not languages:
+        print(f"No accepted submissions for {args.problem}.")
+    for language in languages:
+        print(f"{language}:")
+        entries = board.top(args.problem, language, args.limit)
+        if not entries:
+            print("  No accepted submissions.")
+        for rank, e in enumerate(entries, 1):
+            print(f"{rank:>3}. {e.user:<32} {e.runtime * 1000:>10.1f} ms {_format_memory(e.peak_rss_kb):>10}  {e.mode}")
+
+
+if __name__ == "__main__":
+    main()
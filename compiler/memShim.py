@@ -0,0 +1,103 @@
+"""
+Peak memory of exec'd programs (compiler/shim/memshim.c).
+
+On Linux exec() carries the old address space's high-water mark into the new
+program's ru_maxrss, so anything started straight from this (large) process
+reports our peak rather than its own. run_process starts programs through a
+tiny C shim instead, which runs them from a fresh fork of itself and reports
+their real peak on a pipe. The shim is compiled with cc on first use and
+cached; where that's impossible, peak memory is simply not reported.
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+from compiler.buildCache import default_cache_dir
+
+SHIM_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shim", "memshim.c")
+
+_shim_path = None
+_shim_tried = False
+_shim_lock = threading.Lock()
+
+
+def _build_shim():
+    if not sys.platform.startswith("linux"):
+        return None
+    cc = shutil.which("cc") or shutil.which("gcc")
+    if cc is None:
+        return None
+    try:
+        with open(SHIM_SRC, "rb") as f:
+            source = f.read()
+    except OSError:
+        return None
+    cache_dir = os.path.join(default_cache_dir(), "shim")
+    path = os.path.join(cache_dir, f"memshim-{hashlib.sha256(source).hexdigest()[:16]}")
+    if os.path.exists(path):
+        return path
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix="tmp-", dir=cache_dir)
+        os.close(fd)
+    except OSError:
+        return None
+    try:
+        res = subprocess.run([cc, "-O2", "-o", staging, SHIM_SRC], capture_output=True, timeout=60)
+        if res.returncode != 0:
+            return None
+        os.replace(staging, path)  # atomic, so a concurrent first use never runs half a binary
+        return path
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    finally:
+        if os.path.exists(staging):
+            os.unlink(staging)
+
+
+def shim_path():
+    """Path of the compiled shim, or None where it can't be had."""
+    global _shim_path, _shim_tried
+    with _shim_lock:
+        if not _shim_tried:
+            _shim_tried = True
+            _shim_path = _build_shim()
+        return _shim_path
+
+
+def shim_command(cmd):
+    """
+    Returns (cmd, read_fd, write_fd): cmd run through the shim plus the pipe it
+    reports on. Start the child with pass_fds=(write_fd,), close write_fd once
+    it's started and collect the result with read_peak(read_fd). Returns
+    (cmd, None, None) where the shim isn't available.
+    """
+    shim = shim_path()
+    # Leave a missing program to Popen, which raises for it as usual
+    if shim is None or shutil.which(cmd[0]) is None:
+        return cmd, None, None
+    read_fd, write_fd = os.pipe()
+    return [shim, str(write_fd), *cmd], read_fd, write_fd
+
+
+def read_peak(read_fd):
+    """Peak RSS in KiB reported on read_fd, or None if the run died before reporting. Closes read_fd."""
+    data = b""
+    try:
+        while True:
+            chunk = os.read(read_fd, 64)
+            if not chunk:
+                break
+            data += chunk
+    except OSError:
+        pass
+    finally:
+        os.close(read_fd)
+    try:
+        return int(data)
+    except ValueError:
+        return None
@@ -0,0 +1,85 @@
+"""
+Managed precompiled headers for C++ submissions.
+
+Parsing <iostream>, <vector> or <bits/stdc++.h> is most of a small g++ compile.
+For each distinct block of leading system includes (say `#include <iostream>`)
+we build a header containing exactly those includes once per compiler version
+and flag set, and pass it to every later compile with `-include`. g++ then
+loads the .gch instead of parsing the headers, and the submission's own
+#include lines become no-ops behind their include guards. Only headers the
+learner already included are precompiled, so no extra names become visible.
+"""
+import os
+import re
+
+from compiler.buildCache import BuildCache, default_cache_dir
+from compiler.process import run_tool
+
+_INCLUDE = re.compile(r"^\s*#\s*include\s*<([^>]+)>\s*$")
+_SKIPPABLE = re.compile(r"^\s*(//.*)?$")
+
+
+def leading_includes(code):
+    """
+    System headers included before the first line of real code, in order.
+    Only a leading block is used: headers after code (or after a #define)
+    could depend on it.
+    """
+    headers = []
+    for line in code.splitlines():
+        m = _INCLUDE.match(line)
+        if m:
+            headers.append(m.group(1).strip())
+        elif not _SKIPPABLE.match(line):
+            break
+    return tuple(headers)
+
+
+class PchCache:
+    def __init__(self, cache_dir=None, max_bytes=512 * 1024 * 1024):
+        # Reuses BuildCache for keying, atomic publish and LRU eviction
+        self.cache = BuildCache(cache_dir or os.path.join(default_cache_dir(), "pch"), max_bytes)
+        self._failed = set()
+
+    def include_args(self, code, tool="g++", flags=(), workspace_pool=None, cancel=None, timeout=None):
+        """
+        Returns the extra g++ arguments (["-include", header]) for code, building
+        the PCH on first use, or [] when there's nothing to precompile or the
+        PCH can't be built. cancel and timeout apply to that build as in run_tool.
+        """
+        headers = leading_includes(code)
+        if not headers:
+            return []
+        text = "".join(f"#include <{h}>\n" for h in headers)
+        key = self.cache.key("C++ PCH", text, tool, list(flags))
+        if key in self._failed:
+            return []
+
+        def build(workdir):
+            header = os.path.join(workdir, "pch.h")
+            with open(header, "w") as f:
+                f.write(text)
+            stderr = run_tool([tool, *flags, "-x", "c++-header", header, "-o", header + ".gch"],
+                              cancel, timeout)
+            if not os.path.exists(header + ".gch"):
+                return stderr or "PCH build failed"
+            return None
+
+        entry, error = self.cache.get_or_build(key, build, workspace_pool)
+        if error:
+            self._failed.add(key)
+            return []
+        return ["-include", os.path.join(entry, "pch.h")]
+
+    def stats(self):
+        return self.cache.stats()
+
+
+_shared_pch = None
+
+
+def shared_pch_cache():
+    global _shared_pch
+    if _shared_pch is None:
+        _shared_pch = PchCache()
+    return _shared_pch
@@ -0,0 +1,398 @@
+"""
+Local problem bank for the Advanced level.
+
+Problems (statement, topic tags, difficulty, test inputs) live in a single
+SQLite file. Tags and difficulty are indexed and listing never loads
+statements or test data, so filtering thousands of problems is one indexed
+query.
+
+Expected outputs come from each problem's reference solution. They are run
+once on import (for the starter set, on a background thread as the bank is
+first opened) and stored next to the inputs together with a hash of the
+reference, so judging a submission only reads them. Editing the reference
+makes the stored outputs stale; judging produces any that are stale or still
+missing before it starts.
+
+Problem files are JSON:
+
+    {"problems": [{"slug": "two-sum", "title": "Two Sum", "difficulty": "easy",
+                   "tags": ["arrays"], "statement": "...",
+                   "reference": {"language": "Python", "code": "..."},
+                   "cases": [{"input": "4 9\\n2 7 11 15\\n"},
+                             {"generate": "random_array", "n": 1000, "seed": 1},
+                             {"input": "...", "expected": "..."}]}]}
+
+    python -m compiler.problemBank import problems.json
+    python -m compiler.problemBank list --tag graphs --difficulty medium
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+
+from compiler import generators
+from compiler.comp import Compiler, BuildCancelled, BuildTimedOut
+from compiler.judge import judge
+from compiler.process import input_text
+
+DIFFICULTIES = ("easy", "medium", "hard")
+# Cases whose expected output was written by the problem author, not the reference
+GIVEN = "given"
+STARTER_PROBLEMS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "problems", "starter.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    difficulty INTEGER NOT NULL,
+    statement TEXT NOT NULL,
+    reference_language TEXT,
+    reference_code TEXT,
+    reference_key TEXT,
+    time_limit REAL
+);
+CREATE INDEX IF NOT EXISTS problems_by_difficulty ON problems (difficulty, id);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    problem_id INTEGER NOT NULL REFERENCES problems (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, problem_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_by_problem ON tags (problem_id);
+CREATE TABLE IF NOT EXISTS cases (
+    problem_id INTEGER NOT NULL REFERENCES problems (id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    input TEXT NOT NULL,
+    expected TEXT,
+    expected_key TEXT,
+    PRIMARY KEY (problem_id, idx)
+) WITHOUT ROWID;
+"""
+
+
+def default_data_dir():
+    """
+    Returns the directory for DSA-Arcade data that isn't a cache (problem bank,
+    leaderboard). Overridden with the DSA_ARCADE_DATA environment variable.
+    """
+    base = os.environ.get("DSA_ARCADE_DATA")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".local", "share", "dsa-arcade")
+    return base
+
+
+def reference_key(language, code):
+    return hashlib.sha256(f"{language}\0{code}".encode()).hexdigest()
+
+
+def _difficulty(value):
+    """Accepts "easy"/"medium"/"hard" or 1-3; returns 1-3."""
+    if isinstance(value, int) and 1 <= value <= len(DIFFICULTIES):
+        return value
+    try:
+        return DIFFICULTIES.index(str(value).lower()) + 1
+    except ValueError:
+        raise ValueError(f"Unknown difficulty {value!r}; expected one of {', '.join(DIFFICULTIES)}") from None
+
+
+def case_input(case):
+    """The input text of a case from a problem file: literal, or a seeded generator call."""
+    if "generate" in case:
+        make = getattr(generators, case["generate"], None)
+        if not callable(make):
+            raise ValueError(f"Unknown generator {case['generate']!r}")
+        args = {k: v for k, v in case.items() if k not in ("generate", "n", "expected")}
+        return input_text(make(case["n"], **args))
+    return case["input"]
+
+
+@dataclass
+class ProblemSummary:
+    id: int
+    slug: str
+    title: str
+    difficulty: str
+    tags: list = field(default_factory=list)
+
+    def __str__(self):
+        return f"{self.title} [{self.difficulty}] {', '.join(self.tags)}"
+
+
+@dataclass
+class Problem(ProblemSummary):
+    statement: str = ""
+    reference_language: str = None
+    reference_code: str = None
+    time_limit: float = None
+
+
+class ProblemBank:
+    """
+    SQLite-backed problem store. One connection is shared by all threads
+    behind a lock; reads are a few indexed lookups so they don't contend.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(default_data_dir(), "problems.db")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._precompute_locks = {}  # problem id -> Lock held while its reference runs
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # ---------------- Browsing -----------------
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM problems").fetchone()[0]
+
+    def tags(self):
+        """[(tag, number of problems)], most used first."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT tag, count(*) FROM tags GROUP BY tag ORDER BY count(*) DESC, tag").fetchall()
+
+    def list(self, tag=None, difficulty=None, search=None, limit=500, offset=0):
+        """
+        ProblemSummary rows, easiest first, filtered by tag, difficulty and a
+        case-insensitive title substring. Statements and cases aren't loaded.
+        """
+        sql = ["SELECT p.id, p.slug, p.title, p.difficulty,"
+               " (SELECT group_concat(tag, ',') FROM tags t WHERE t.problem_id = p.id) FROM problems p"]
+        where, params = [], []
+        if tag:
+            sql.append("JOIN tags f ON f.problem_id = p.id AND f.tag = ?")
+            params.append(tag)
+        if difficulty:
+            where.append("p.difficulty = ?")
+            params.append(_difficulty(difficulty))
+        if search:
+            where.append("p.title LIKE ?")
+            params.append(f"%{search}%")
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY p.difficulty, p.id LIMIT ? OFFSET ?")
+        params += [limit, offset]
+        with self._lock:
+            rows = self._db.execute(" ".join(sql), params).fetchall()
+        return [ProblemSummary(pid, slug, title, DIFFICULTIES[level - 1], sorted(tags.split(",")) if tags else [])
+                for pid, slug, title, level, tags in rows]
+
+    def get(self, key):
+        """The Problem with this id or slug, or None."""
+        column = "id" if isinstance(key, int) else "slug"
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, slug, title, difficulty, statement, reference_language, reference_code, time_limit"
+                f" FROM problems WHERE {column} = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            tags = [t for (t,) in self._db.execute("SELECT tag FROM tags WHERE problem_id = ? ORDER BY tag",
+                                                   (row[0],))]
+        pid, slug, title, level, statement, ref_language, ref_code, time_limit = row
+        return Problem(pid, slug, title, DIFFICULTIES[level - 1], tags, statement, ref_language, ref_code,
+                       time_limit)
+
+    # ---------------- Editing -----------------
+    def add(self, slug, title, statement, difficulty, tags=(), cases=(), reference_code=None,
+            reference_language="Python", time_limit=None):
+        """
+        Adds the problem, or replaces the one with the same slug; returns its id.
+        cases are input strings or (input, expected) pairs. Inputs without an
+        expected output get one from the reference solution (see precompute).
+        """
+        ref_key = reference_key(reference_language, reference_code) if reference_code else None
+        with self._lock, self._db:
+            row = self._db.execute("SELECT id FROM problems WHERE slug = ?", (slug,)).fetchone()
+            values = (title, _difficulty(difficulty), statement, reference_language if reference_code else None,
+                      reference_code, ref_key, time_limit)
+            if row:
+                pid = row[0]
+                self._db.execute(
+                    "UPDATE problems SET title = ?, difficulty = ?, statement = ?, reference_language = ?,"
+                    " reference_code = ?, reference_key = ?, time_limit = ? WHERE id = ?", values + (pid,))
+                self._db.execute("DELETE FROM tags WHERE problem_id = ?", (pid,))
+                self._db.execute("DELETE FROM cases WHERE problem_id = ?", (pid,))
+            else:
+                pid = self._db.execute(
+                    "INSERT INTO problems (title, difficulty, statement, reference_language, reference_code,"
+                    " reference_key, time_limit, slug) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", values + (slug,)).lastrowid
+            self._db.executemany("INSERT OR IGNORE INTO tags (tag, problem_id) VALUES (?, ?)",
+                                 [(t.lower(), pid) for t in tags])
+            rows = []
+            for i, case in enumerate(cases):
+                user_input, expected = (case, None) if isinstance(case, str) else case
+                rows.append((pid, i, user_input, expected, GIVEN if expected is not None else None))
+            self._db.executemany(
+                "INSERT INTO cases (problem_id, idx, input, expected, expected_key) VALUES (?, ?, ?, ?, ?)", rows)
+        return pid
+
+    def remove(self, key):
+        problem = self.get(key)
+        if problem:
+            with self._lock, self._db:
+                self._db.execute("DELETE FROM problems WHERE id = ?", (problem.id,))
+
+    def import_file(self, path, precompute=True, compiler=None):
+        """Adds every problem in a JSON problem file; returns their ids."""
+        with open(path) as f:
+            data = json.load(f)
+        ids = []
+        for p in data["problems"]:
+            reference = p.get("reference") or {}
+            cases = [(case_input(c), c["expected"]) if "expected" in c else case_input(c) for c in p["cases"]]
+            ids.append(self.add(p["slug"], p["title"], p["statement"], p["difficulty"], p.get("tags", ()),
+                                cases, reference.get("code"), reference.get("language", "Python"),
+                                p.get("time_limit")))
+            if precompute:
+                self.precompute(ids[-1], compiler)
+        return ids
+
+    # ---------------- Reference outputs -----------------
+    def _stale_cases(self, pid):
+        with self._lock:
+            return self._db.execute(
+                "SELECT c.idx, c.input FROM cases c JOIN problems p ON p.id = c.problem_id"
+                " WHERE c.problem_id = ? AND (c.expected IS NULL"
+                " OR (c.expected_key IS NOT ? AND c.expected_key IS NOT p.reference_key)) ORDER BY c.idx",
+                (pid, GIVEN)).fetchall()
+
+    def precompute(self, key, compiler=None):
+        """
+        Runs the reference solution on every case whose stored output is missing
+        or was produced by an older reference; returns how many were run.
+        Concurrent calls for one problem run the reference only once.
+        """
+        problem = self.get(key)
+        if problem is None:
+            raise KeyError(key)
+        with self._lock:
+            running = self._precompute_locks.setdefault(problem.id, threading.Lock())
+        with running:
+            # Re-read under the lock: whoever held it may have just filled the outputs in
+            return self._precompute(self.get(problem.id), compiler)
+
+    def _precompute(self, problem, compiler):
+        stale = self._stale_cases(problem.id)
+        if not stale:
+            return 0
+        if not problem.reference_code:
+            raise ValueError(f"{problem.slug}: cases without expected output and no reference solution")
+        compiler = compiler or Compiler(problem.reference_language)
+        try:
+            program, error = compiler.prepare(problem.reference_code, language=problem.reference_language)
+        except (BuildCancelled, BuildTimedOut) as e:
+            program, error = None, str(e) or "Build cancelled."
+        if error:
+            raise RuntimeError(f"{problem.slug}: reference solution failed to build:\n{error}")
+        timeout = problem.time_limit or compiler.RUN_TIMEOUT
+        ref_key = reference_key(problem.reference_language, problem.reference_code)
+        outputs = []
+        try:
+            for idx, user_input in stale:
+                result = program.execute(user_input, timeout=timeout, max_output_bytes=compiler.MAX_OUTPUT_BYTES)
+                if result.timed_out or result.returncode != 0 or result.truncated:
+                    raise RuntimeError(f"{problem.slug}: reference solution failed on case {idx + 1}:\n"
+                                       f"{result.output.strip() or 'timed out'}")
+                outputs.append((result.stdout, ref_key, problem.id, idx))
+        finally:
+            program.close()
+        with self._lock, self._db:
+            self._db.executemany("UPDATE cases SET expected = ?, expected_key = ? WHERE problem_id = ? AND idx = ?",
+                                 outputs)
+        return len(outputs)
+
+    def precompute_in_background(self):
+        """
+        Starts a daemon thread that fills in every problem's missing or stale
+        outputs. A judge that gets to a problem first waits for it rather than
+        running the reference again; a reference that fails is reported when
+        its problem is judged.
+        """
+        def run():
+            for problem in self.list(limit=-1):
+                try:
+                    self.precompute(problem.id)
+                except Exception:
+                    pass
+
+        thread = threading.Thread(target=run, daemon=True, name="problem-bank-precompute")
+        thread.start()
+        return thread
+
+    def cases(self, key, compiler=None):
+        """[(input, expected output)] of a problem, producing missing outputs first."""
+        problem = self.get(key)
+        if problem is None:
+            raise KeyError(key)
+        self.precompute(problem.id, compiler)
+        with self._lock:
+            return self._db.execute("SELECT input, expected FROM cases WHERE problem_id = ? ORDER BY idx",
+                                    (problem.id,)).fetchall()
+
+    # ---------------- Judging -----------------
+    def judge(self, key, code, language, compiler=None, **options):
+        """Judges a submission against the stored expected outputs; returns a JudgeReport."""
+        problem = self.get(key)
+        if problem is None:
+            raise KeyError(key)
+        cases = self.cases(problem.id)
+        options.setdefault("timeout", problem.time_limit)
+        if compiler is not None and not isinstance(compiler, Compiler):
+            # RemoteCompiler: the server judges, with this problem's time limit
+            return compiler.judge(code, cases, timeout=options["timeout"], language=language)
+        return judge(code, language, cases, compiler=compiler, **options)
+
+
+_shared_bank = None
+_shared_lock = threading.Lock()
+
+
+def shared_problem_bank():
+    """The default bank, seeded with the starter problems the first time it is opened."""
+    global _shared_bank
+    with _shared_lock:
+        if _shared_bank is None:
+            _shared_bank = ProblemBank(os.environ.get("DSA_ARCADE_PROBLEMS"))
+            if _shared_bank.count() == 0 and os.path.exists(STARTER_PROBLEMS):
+                _shared_bank.import_file(STARTER_PROBLEMS, precompute=False)
+            # Off the caller's thread, so opening the bank stays instant
+            _shared_bank.precompute_in_background()
+        return _shared_bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local DSA-Arcade problem bank")
+    parser.add_argument("--db", help="problem bank file (default: the shared bank)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="add problems from JSON files and precompute their outputs")
+    imp.add_argument("files", nargs="+")
+    lst = sub.add_parser("list", help="list problems")
+    lst.add_argument("--tag")
+    lst.add_argument("--difficulty", choices=DIFFICULTIES)
+    lst.add_argument("--search")
+    sub.add_parser("precompute", help="produce any missing or stale expected outputs")
+    args = parser.parse_args()
+
+    bank = ProblemBank(args.db) if args.db else shared_problem_bank()
+    if args.command == "import":
+        for path in args.files:
+            print(f"{path}: {len(bank.import_file(path))} problems")
+    elif args.command == "list":
+        for p in bank.list(args.tag, args.difficulty, args.search, limit=-1):
+            print(f"{p.id:>6}  {p.slug:<32} {p}")
+    else:
+        total = sum(bank.precompute(p.id) for p in bank.list(limit=-1))
+        print(f"{total} reference outputs computed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+Child process execution with streamed, capped output.
+
+On POSIX every child starts in a process group of its own, and killing it
+(timeout, output cap, cancel) kills the whole group: g++'s cc1plus/as/ld, or
+anything a submission spawned, go down with it.
+"""
+import codecs
+import os
+import signal
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+
+from compiler.memShim import shim_command, read_peak
+
+try:
+    import resource
+except ImportError:  # Windows: no rusage/rlimits, runs are still timed
+    resource = None
+
+CHUNK_SIZE = 65536
+# Popen arguments that give the child its own process group
+NEW_GROUP = {"start_new_session": True} if os.name != "nt" else {}
+# How often blocking waits look at a cancel Event
+CANCEL_POLL = 0.05
+
+
+@dataclass
+class ProcessResult:
+    stdout: str = ""
+    stderr: str = ""
+    returncode: int = 0
+    timed_out: bool = False
+    truncated: bool = False
+    wall_time: float = 0.0
+    # From the child's rusage; None where the platform (or runner) can't tell
+    cpu_user: float = None
+    cpu_sys: float = None
+    peak_rss_kb: int = None
+    # Part of wall_time spent starting the child; None where the runner can't tell
+    spawn_time: float = None
+    # Killed because its cancel Event was set
+    cancelled: bool = False
+    # Replayed from the result cache rather than run again
+    cached: bool = False
+
+    @property
+    def output(self):
+        return f"{self.stdout}{self.stderr}"
+
+    @property
+    def cpu_time(self):
+        if self.cpu_user is None:
+            return None
+        return self.cpu_user + self.cpu_sys
+
+    def usage_summary(self):
+        """One-line resource report, e.g. for the editor status bar."""
+        parts = [f"Wall {self.wall_time * 1000:.1f} ms"]
+        if self.cached:
+            parts.insert(0, "Cached")
+        if self.cpu_user is not None:
+            parts.append(f"CPU {self.cpu_time * 1000:.1f} ms "
+                         f"(user {self.cpu_user * 1000:.1f} + sys {self.cpu_sys * 1000:.1f})")
+        if self.peak_rss_kb is not None:
+            parts.append(f"Peak RSS {self.peak_rss_kb / 1024:.1f} MB")
+        return " | ".join(parts)
+
+
+@dataclass
+class ResourceLimits:
+    """Optional rlimits applied to the child before it runs (POSIX only)."""
+    address_space: int = None  # bytes
+    cpu_seconds: int = None
+
+    def apply(self):
+        """Sets the limits on the current process; call in the child."""
+        if resource is None:
+            return
+        if self.address_space:
+            resource.setrlimit(resource.RLIMIT_AS, (self.address_space, self.address_space))
+        if self.cpu_seconds:
+            # Soft limit sends SIGXCPU, hard limit one second later is SIGKILL
+            resource.setrlimit(resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds + 1))
+
+    def as_dict(self):
+        return {"address_space": self.address_space, "cpu_seconds": self.cpu_seconds}
+
+
+# ---------------- Stdin sources -----------------
+class FileInput:
+    """Stdin read straight from a file; the child gets the file itself as fd 0."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            while True:
+                data = f.read(CHUNK_SIZE)
+                if not data:
+                    return
+                yield data
+
+    def __repr__(self):
+        return f"FileInput({self.path!r})"
+
+
+class StreamInput:
+    """
+    Stdin produced piece by piece by make_chunks(*args), a generator of str or
+    bytes chunks. Iterating starts the generator afresh, so the same input can
+    be fed to several runs without ever being held in memory as a whole.
+    """
+
+    def __init__(self, make_chunks, *args, name=None):
+        self.make_chunks = make_chunks
+        self.args = args
+        self.name = name or make_chunks.__name__
+
+    def __iter__(self):
+        for chunk in self.make_chunks(*self.args):
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+
+    def __repr__(self):
+        return f"{self.name}{self.args}" if self.args else self.name
+
+
+def is_streamed(user_input):
+    return isinstance(user_input, (FileInput, StreamInput))
+
+
+def input_text(user_input):
+    """The whole input as a str (for consumers that need it in memory)."""
+    if not is_streamed(user_input):
+        return user_input.decode() if isinstance(user_input, bytes) else user_input
+    return b"".join(user_input).decode()
+
+
+def spool_input(user_input, directory=None):
+    """Writes a streamed input to a temp file chunk by chunk; returns its path."""
+    import tempfile
+    fd, path = tempfile.mkstemp(prefix="stdin-", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        for chunk in user_input:
+            f.write(chunk)
+    return path
+
+
+def rusage_fields(ru):
+    """
+    Maps a struct_rusage to ProcessResult CPU times. Its ru_maxrss is left out:
+    exec() carries our own peak into it (see compiler/memShim.py).
+    """
+    return {"cpu_user": ru.ru_utime, "cpu_sys": ru.ru_stime}
+
+
+class OutputCollector:
+    """
+    Accumulates stdout/stderr chunks up to max_bytes (shared by both streams),
+    decoding UTF-8 incrementally and forwarding text to on_output(stream, text)
+    as it arrives. Once the cap is hit, further output is dropped and
+    `truncated` is set; the caller is expected to kill the producer.
+    """
+
+    def __init__(self, max_bytes=None, on_output=None):
+        self.max_bytes = max_bytes
+        self.on_output = on_output
+        self.truncated = False
+        self._total = 0
+        self._parts = {"stdout": [], "stderr": []}
+        self._decoders = {name: codecs.getincrementaldecoder("utf-8")(errors="replace") for name in self._parts}
+        self._lock = threading.Lock()
+
+    def feed(self, stream, data, final=False):
+        """Adds raw bytes; returns False once the byte cap has been reached."""
+        with self._lock:
+            if self.truncated:
+                return False
+            if self.max_bytes is not None and self._total + len(data) > self.max_bytes:
+                data = data[:self.max_bytes - self._total]
+                self.truncated = True
+            self._total += len(data)
+            text = self._decoders[stream].decode(data, final=final or self.truncated)
+            if text:
+                text = text.replace("\r\n", "\n")
+                self._parts[stream].append(text)
+        if text and self.on_output:
+            self.on_output(stream, text)
+        return not self.truncated
+
+    def text(self, stream):
+        return "".join(self._parts[stream])
+
+
+def _pump(pipe, name, collector, on_cap):
+    read = getattr(pipe, "read1", pipe.read)
+    try:
+        while True:
+            data = read(CHUNK_SIZE)
+            if not data:
+                collector.feed(name, b"", final=True)
+                break
+            if not collector.feed(name, data):
+                on_cap()
+                break
+    except (OSError, ValueError):
+        pass
+
+
+def _feed_stdin(pipe, user_input):
+    try:
+        if isinstance(user_input, StreamInput):
+            for chunk in user_input:
+                pipe.write(chunk)
+        elif user_input:
+            pipe.write(user_input.encode() if isinstance(user_input, str) else user_input)
+    except (BrokenPipeError, OSError):
+        pass
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+
+def kill_group(pid):
+    """SIGKILLs the process group led by pid (started with NEW_GROUP)."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def _kill(proc):
+    """
+    Kills proc and its process group without reaping it. Popen.kill() polls
+    first, which would steal the exit status (and rusage) from the wait4 thread.
+    """
+    if proc.returncode is not None:
+        return
+    if os.name == "nt":
+        try:
+            proc.kill()
+        except OSError:
+            pass
+    else:
+        kill_group(proc.pid)
+
+
+def _wait(proc, timeout, cancel=None):
+    """
+    Waits for proc, reaping it with wait4 where available so its rusage can be
+    collected. Setting the optional cancel Event kills it early. Returns
+    (timed_out, cancelled, rusage or None).
+    """
+    deadline = time.monotonic() + timeout
+    if not hasattr(os, "wait4"):
+        while True:
+            remaining = deadline - time.monotonic()
+            cancelled = cancel is not None and cancel.is_set()
+            if remaining <= 0 or cancelled:
+                proc.kill()
+                proc.wait()
+                return not cancelled, cancelled, None
+            try:
+                proc.wait(timeout=min(remaining, CANCEL_POLL) if cancel else remaining)
+                return False, False, None
+            except subprocess.TimeoutExpired:
+                pass
+
+    reaped = []
+
+    def reap():
+        if hasattr(os, "waitid"):
+            # Wait without reaping, so the group id is still ours, and clear out
+            # whatever the program left running: it would hold our pipes open
+            os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+            kill_group(proc.pid)
+        _, status, ru = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        reaped.append(ru)
+
+    waiter = threading.Thread(target=reap, daemon=True)
+    waiter.start()
+    timed_out = cancelled = False
+    while waiter.is_alive():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        if cancel is not None and cancel.is_set():
+            cancelled = True
+            break
+        waiter.join(min(remaining, CANCEL_POLL) if cancel else remaining)
+    if timed_out or cancelled:
+        _kill(proc)
+        waiter.join()
+    return timed_out, cancelled, reaped[0] if reaped else None
+
+
+# ---------------- Tools -----------------
+class BuildCancelled(Exception):
+    pass
+
+
+class BuildTimedOut(Exception):
+    def __init__(self, timeout):
+        super().__init__(f"Compilation timed out after {timeout} s.")
+        self.timeout = timeout
+
+
+def run_tool(cmd, cancel=None, timeout=None):
+    """
+    Runs a compiler and returns its stderr. The tool and everything it starts
+    are killed if cancel (a threading.Event) gets set, raising BuildCancelled,
+    or after timeout seconds, raising BuildTimedOut.
+    """
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, **NEW_GROUP)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        try:
+            return proc.communicate(timeout=CANCEL_POLL if cancel or deadline else None)[1]
+        except subprocess.TimeoutExpired:
+            cancelled = cancel is not None and cancel.is_set()
+            expired = deadline is not None and time.monotonic() >= deadline
+            if cancelled or expired:
+                if os.name == "nt":
+                    proc.kill()
+                else:
+                    kill_group(proc.pid)
+                proc.communicate()
+                raise BuildCancelled() if cancelled else BuildTimedOut(timeout)
+
+
+def run_process(cmd, user_input="", timeout=5, on_output=None, max_output_bytes=None, limits=None,
+                cancel=None, **popen_kwargs):
+    """
+    Runs cmd feeding user_input on stdin and reading stdout/stderr in chunks as
+    they arrive. The process (group) is killed when it exceeds timeout,
+    produces more than max_output_bytes of output or the optional cancel Event
+    is set. limits (ResourceLimits) are applied in the child on POSIX.
+
+    user_input may be a str/bytes, a StreamInput (written to the pipe as it is
+    generated) or a FileInput (opened and handed to the child as its stdin).
+    """
+    if limits and resource is not None:
+        popen_kwargs["preexec_fn"] = limits.apply
+    popen_kwargs = {**NEW_GROUP, **popen_kwargs}
+    cmd, peak_fd, report_fd = shim_command(cmd)
+    if report_fd is not None:
+        popen_kwargs["pass_fds"] = (*popen_kwargs.get("pass_fds", ()), report_fd)
+    stdin_file = open(user_input.path, "rb") if isinstance(user_input, FileInput) else None
+    start = time.perf_counter()
+    try:
+        proc = subprocess.Popen(cmd, stdin=stdin_file or subprocess.PIPE, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, **popen_kwargs)
+        spawn_time = time.perf_counter() - start
+    except BaseException:
+        if peak_fd is not None:
+            os.close(peak_fd)
+        raise
+    finally:
+        if stdin_file:
+            stdin_file.close()  # the child has its own copy of the fd
+        if report_fd is not None:
+            os.close(report_fd)
+    collector = OutputCollector(max_output_bytes, on_output)
+
+    def kill():
+        _kill(proc)
+
+    threads = [
+        threading.Thread(target=_pump, args=(proc.stdout, "stdout", collector, kill), daemon=True),
+        threading.Thread(target=_pump, args=(proc.stderr, "stderr", collector, kill), daemon=True),
+    ]
+    if proc.stdin:
+        threads.append(threading.Thread(target=_feed_stdin, args=(proc.stdin, user_input), daemon=True))
+    for t in threads:
+        t.start()
+
+    timed_out, cancelled, ru = _wait(proc, timeout, cancel)
+    wall_time = time.perf_counter() - start
+    for t in threads[:2]:
+        t.join()
+    for pipe in (proc.stdout, proc.stderr):
+        pipe.close()
+    peak_rss_kb = read_peak(peak_fd) if peak_fd is not None else None
+
+    return ProcessResult(
+        stdout=collector.text("stdout"),
+        stderr=collector.text("stderr"),
+        returncode=proc.returncode,
+        timed_out=timed_out,
+        truncated=collector.truncated,
+        wall_time=wall_time,
+        spawn_time=spawn_time,
+        cancelled=cancelled,
+        peak_rss_kb=peak_rss_kb,
+        **(rusage_fields(ru) if ru else {}),
+    )
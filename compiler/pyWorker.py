@@ -0,0 +1,577 @@
+"""
+Warm Python workers for running submissions.
+
+Each worker is a long-lived interpreter (started by running this file) that
+already has the usual DSA stdlib modules imported. For every submission it
+forks a fresh child, wires the child's stdin/stdout/stderr to pipes and runs the
+code as __main__, so a run only pays for a fork instead of a full interpreter
+start. Requests and replies are length-prefixed JSON frames on the worker's
+stdin/stdout. While a run is in flight the client may send {"cancel": id} to
+kill it; the child runs in its own process group, which is killed as a whole.
+
+POSIX only (needs os.fork); Compiler falls back to a plain `python` process
+elsewhere.
+"""
+import codecs
+import itertools
+import json
+import linecache
+import os
+import queue
+import selectors
+import signal
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import types
+
+WARM_MODULES = ("collections", "heapq", "itertools", "bisect", "math", "functools", "string", "re")
+# This file's directory; the worker takes it off sys.path so submissions can't import the judge
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+_HEADER = struct.Struct(">I")
+
+# Submissions run with a fixed str hash seed, so iterating a set prints the
+# same order every time and runs stay replayable (see compiler.resultCache)
+PYTHON_ENV = {"PYTHONHASHSEED": "0"}
+
+
+# ---------------- Framing -----------------
+def _read_exact(stream, n):
+    data = b""
+    while len(data) < n:
+        chunk = stream.read(n - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def read_frame(stream):
+    header = _read_exact(stream, _HEADER.size)
+    if header is None:
+        return None
+    body = _read_exact(stream, _HEADER.unpack(header)[0])
+    if body is None:
+        return None
+    return json.loads(body.decode())
+
+
+def write_frame(stream, obj):
+    body = json.dumps(obj).encode()
+    stream.write(_HEADER.pack(len(body)) + body)
+    stream.flush()
+
+
+# ---------------- Worker side -----------------
+def _exec_submission(code, line_buffered=False, optimize=0, trace=None):
+    """
+    Runs code as __main__ in the forked child. Returns the exit code. trace is
+    an optional TraceOptions dict; the tracer only watches the submission.
+    """
+    sys.stdin = open(0, "r", closefd=False)
+    sys.stdout = open(1, "w", buffering=1 if line_buffered else -1, closefd=False)
+    sys.stderr = open(2, "w", buffering=1, closefd=False)
+    sys.argv = ["main.py"]
+    if "random" in sys.modules:
+        sys.modules["random"].seed()
+
+    main = types.ModuleType("__main__")
+    main.__file__ = "main.py"
+    sys.modules["__main__"] = main
+    # Tracebacks should quote the submission, not whatever main.py is in our cwd
+    linecache.cache["main.py"] = (len(code), None, code.splitlines(True), "main.py")
+
+    tracer = None
+    if trace:
+        tracer = _load_tracer().Tracer(trace["path"], trace["sample_every"], trace["ops"], trace["max_events"])
+
+    exit_code = 0
+    try:
+        if tracer:
+            program = tracer.compile(code, "main.py", optimize=optimize)
+            tracer.start(main.__dict__)
+        else:
+            program = compile(code, "main.py", "exec", optimize=optimize)
+        exec(program, main.__dict__)
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException as e:
+        tb = e.__traceback__.tb_next  # drop our own exec() frame so it looks like `python main.py`
+        if isinstance(e, SyntaxError) and e.filename == "main.py" and e.lineno:
+            # The parser re-reads the "file" for the caret line; point it back at the submission
+            lines = code.splitlines()
+            e.text = lines[e.lineno - 1] + "\n" if e.lineno <= len(lines) else None
+            tb = None  # raised while compiling (maybe by the tracer), before any submission frame
+        traceback.print_exception(type(e), e, tb)
+        exit_code = 1
+    finally:
+        if tracer:
+            tracer.stop()
+
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+    return exit_code
+
+
+def _load_tracer():
+    """compiler/tracer.py, loaded by path under a private name (compiler/ isn't on sys.path)."""
+    import importlib.util
+    name = "_dsa_arcade_tracer"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(_HERE, "tracer.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+_CLEAR_REFS = "/proc/self/clear_refs"
+_can_reset_peak = None
+_libc = None
+
+
+def _load_libc():
+    """glibc, for malloc_trim; loaded by the worker once rather than in every child."""
+    global _libc
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None)
+        libc.malloc_trim  # glibc only
+        _libc = libc
+    except (ImportError, OSError, AttributeError):
+        _libc = None
+
+
+def _reset_peak_rss():
+    """
+    Resets this process's peak RSS to its current RSS (Linux). A fork child
+    starts with the worker's peak; reset, it reports the submission's own.
+    """
+    if _libc is not None:
+        _libc.malloc_trim(0)  # hand back what the worker freed (e.g. earlier inputs) first
+    try:
+        with open(_CLEAR_REFS, "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_resettable():
+    """Whether forked children can reset their peak; checked once, on the worker itself."""
+    global _can_reset_peak
+    if _can_reset_peak is None:
+        _can_reset_peak = _reset_peak_rss()
+    return _can_reset_peak
+
+
+def _apply_limits(limits):
+    if not limits:
+        return
+    import resource
+    if limits.get("address_space"):
+        resource.setrlimit(resource.RLIMIT_AS, (limits["address_space"],) * 2)
+    if limits.get("cpu_seconds"):
+        resource.setrlimit(resource.RLIMIT_CPU, (limits["cpu_seconds"], limits["cpu_seconds"] + 1))
+
+
+def _run_forked(request, emit, control=None):
+    """
+    Forks a child for one submission and relays its output through
+    emit(frame) as {"stream", "data"} frames while it runs. A matching cancel
+    frame arriving on the control stream kills the child. Returns the final
+    status frame.
+    """
+    stream = request.get("stream", False)
+    max_output = request.get("max_output")
+    measure_peak = _peak_rss_resettable()
+
+    in_r, in_w = os.pipe()
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+
+    fork_start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 1
+        try:
+            os.setsid()  # own process group, so a kill takes whatever it spawns too
+            os.dup2(out_w, 1)
+            os.dup2(err_w, 2)
+            if request.get("input_path"):
+                # File-backed stdin: the child reads the file directly
+                fd = os.open(request["input_path"], os.O_RDONLY)
+                os.dup2(fd, 0)
+                os.close(fd)
+            else:
+                os.dup2(in_r, 0)
+            for fd in (in_r, in_w, out_r, out_w, err_r, err_w):
+                os.close(fd)
+            _apply_limits(request.get("limits"))
+            # Let go of the worker's copy of the input before measuring from here
+            request.pop("input", None)
+            _reset_peak_rss()
+            exit_code = _exec_submission(request["code"], line_buffered=stream,
+                                         optimize=1 if request.get("optimize") else 0,
+                                         trace=request.get("trace"))
+        finally:
+            os._exit(exit_code)
+
+    spawn_time = time.perf_counter() - fork_start
+    for fd in (in_r, out_w, err_w):
+        os.close(fd)
+
+    pending = request.get("input", "").encode()
+    names = {out_r: "stdout", err_r: "stderr"}
+    decoders = {fd: codecs.getincrementaldecoder("utf-8")(errors="replace") for fd in names}
+    total = 0
+    deadline = time.monotonic() + request.get("timeout", 5)
+    timed_out = False
+    truncated = False
+    cancelled = False
+
+    sel = selectors.DefaultSelector()
+    sel.register(out_r, selectors.EVENT_READ)
+    sel.register(err_r, selectors.EVENT_READ)
+    if control is not None:
+        sel.register(control, selectors.EVENT_READ)
+    if pending:
+        os.set_blocking(in_w, False)
+        sel.register(in_w, selectors.EVENT_WRITE)
+    else:
+        os.close(in_w)
+    pipes = (out_r, err_r, in_w) if pending else (out_r, err_r)
+
+    # Once the child exits its group is killed, so whatever it started can't
+    # hold the pipes open. A pidfd says when; otherwise poll. The run only ends
+    # when both the pipes are done and the child has exited: a child that
+    # closes its stdout and stderr still runs under the deadline and cancel.
+    exit_fd = _pidfd(pid)
+    if exit_fd is not None:
+        sel.register(exit_fd, selectors.EVENT_READ)
+    poll_exit = exit_fd is None
+    exited = False
+    reaped = None  # (status, rusage) where polling had to reap the child
+
+    while not truncated and not cancelled:
+        if exited and not any(fd in sel.get_map() for fd in pipes):
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        for key, _ in sel.select(min(remaining, 0.05) if poll_exit and not exited else remaining):
+            fd = key.fd
+            if fd == exit_fd:
+                exited = True
+                sel.unregister(exit_fd)
+                _kill_group(pid)
+                continue
+            if key.fileobj is control:
+                frame = read_frame(control)
+                if frame is None or frame.get("cancel") == request.get("id"):
+                    cancelled = True  # a closed control stream means the client is gone
+                    break
+                continue
+            if fd == in_w:
+                try:
+                    written = os.write(in_w, pending[:65536])
+                    pending = pending[written:]
+                except BrokenPipeError:
+                    pending = b""
+                if not pending:
+                    sel.unregister(in_w)
+                    os.close(in_w)
+                continue
+
+            data = os.read(fd, 65536)
+            if max_output is not None and total + len(data) > max_output:
+                data = data[:max_output - total]
+                truncated = True
+            total += len(data)
+            text = decoders[fd].decode(data, final=not data or truncated)
+            if text:
+                emit({"stream": names[fd], "data": text})
+            if not data or truncated:
+                sel.unregister(fd)
+                os.close(fd)
+            if truncated:
+                break
+        if poll_exit and not exited:
+            state = _poll_exit(pid)
+            if state is not None:
+                exited = True
+                _kill_group(pid)
+                reaped = state or None
+
+    if exit_fd is not None and exited:
+        os.close(exit_fd)
+
+    if control is not None:
+        sel.unregister(control)
+    for key in list(sel.get_map().values()):
+        sel.unregister(key.fd)
+        os.close(key.fd)
+    sel.close()
+
+    if timed_out or truncated or cancelled:
+        _kill_group(pid)
+    if reaped is not None:
+        status, ru = reaped
+    else:
+        if hasattr(os, "waitid"):
+            # Wait without reaping (the group id stays ours), then clear out anything left in it
+            os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+            _kill_group(pid)
+        _, status, ru = os.wait4(pid, 0)
+
+    return {
+        "returncode": os.waitstatus_to_exitcode(status),
+        "timed_out": timed_out,
+        "truncated": truncated,
+        "cancelled": cancelled,
+        "cpu_user": ru.ru_utime,
+        "cpu_sys": ru.ru_stime,
+        "peak_rss_kb": ru.ru_maxrss if measure_peak else None,
+        "spawn_time": spawn_time,
+    }
+
+
+def _pidfd(pid):
+    """A descriptor that becomes readable when pid exits (Linux 5.3+), or None."""
+    try:
+        return os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        return None
+
+
+def _poll_exit(pid):
+    """
+    None while pid runs. Once it has exited: () where it's left waitable
+    (waitid), or (status, rusage) where checking had to reap it (no waitid).
+    """
+    if hasattr(os, "waitid"):
+        return () if os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) else None
+    wpid, status, ru = os.wait4(pid, os.WNOHANG)
+    return (status, ru) if wpid else None
+
+
+def _kill_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def serve():
+    # Run as a script, so sys.path[0] is compiler/; a submission's `import judge` must not find ours
+    sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != _HERE]
+    for name in WARM_MODULES:
+        __import__(name)
+    _load_libc()
+
+    # Unbuffered, so a cancel frame is never stuck in a read-ahead buffer the selector can't see
+    requests_in = sys.stdin.buffer.raw
+    replies_out = sys.stdout.buffer
+    while True:
+        request = read_frame(requests_in)
+        if request is None:
+            break
+        if "cancel" in request:
+            continue  # arrived after its run had already finished
+        write_frame(replies_out, _run_forked(request, lambda frame: write_frame(replies_out, frame),
+                                             control=requests_in))
+
+
+# ---------------- Client side -----------------
+class _Worker:
+    def __init__(self, python):
+        self.proc = subprocess.Popen(
+            [python, os.path.abspath(__file__)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env={**os.environ, **PYTHON_ENV},
+        )
+        self._write_lock = threading.Lock()
+
+    def request(self, obj, on_frame, cancel=None):
+        """
+        Sends a request, passing output frames to on_frame. Returns the status
+        frame. Setting the optional cancel Event asks the worker to kill the run.
+        """
+        with self._write_lock:
+            write_frame(self.proc.stdin, obj)
+        finished = threading.Event()
+        if cancel is not None:
+            threading.Thread(target=self._forward_cancel, args=(obj["id"], cancel, finished),
+                             daemon=True).start()
+        try:
+            while True:
+                reply = read_frame(self.proc.stdout)
+                if reply is None:
+                    raise EOFError("Python worker exited unexpectedly.")
+                if "stream" not in reply:
+                    return reply
+                on_frame(reply)
+        finally:
+            finished.set()
+
+    def _forward_cancel(self, request_id, cancel, finished):
+        while not finished.is_set():
+            if cancel.wait(0.05):
+                with self._write_lock:
+                    if not finished.is_set():
+                        try:
+                            write_frame(self.proc.stdin, {"cancel": request_id})
+                        except OSError:
+                            pass
+                return
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+
+
+class PythonWorkerPool:
+    """Pool of warm worker interpreters, each serving one run at a time."""
+
+    def __init__(self, size=None, python=None):
+        self.size = size or max(2, min(4, os.cpu_count() or 1))
+        self.python = python or sys.executable
+        self._idle = queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    @staticmethod
+    def supported():
+        return hasattr(os, "fork")
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle.empty() and self._started < self.size:
+                self._started += 1
+                return _Worker(self.python)
+        return self._idle.get()
+
+    def _release(self, worker):
+        if worker.alive():
+            self._idle.put(worker)
+        else:
+            with self._lock:
+                self._started -= 1
+
+    def warm_up(self):
+        """Starts all workers ahead of the first run."""
+        with self._lock:
+            while self._started < self.size:
+                self._started += 1
+                self._idle.put(_Worker(self.python))
+
+    def run(self, code, user_input="", timeout=5, on_output=None, max_output_bytes=None, limits=None,
+            optimize=False, trace=None, cancel=None):
+        """
+        Runs code on a warm worker and returns a ProcessResult. on_output(stream,
+        text) receives output as it is produced; more than max_output_bytes of
+        output kills the run. limits is an optional ResourceLimits; optimize
+        compiles the code as `python -O` would; trace is an optional
+        TraceOptions (see compiler.tracer). Setting the optional cancel Event
+        kills the run (and anything it started). user_input may also be a
+        FileInput or StreamInput (spooled to a RAM-backed temp file first).
+        """
+        # Not importable when this file runs as the worker
+        from compiler.process import ProcessResult, FileInput, StreamInput, spool_input
+        from compiler.workspace import default_workspace_root
+
+        # Streamed stdin reaches the child as a file rather than through the JSON request
+        input_path = spooled = None
+        if isinstance(user_input, FileInput):
+            input_path = os.path.abspath(user_input.path)
+        elif isinstance(user_input, StreamInput):
+            input_path = spooled = spool_input(user_input, default_workspace_root())
+
+        parts = {"stdout": [], "stderr": []}
+
+        def on_frame(frame):
+            text = frame["data"].replace("\r\n", "\n")
+            parts[frame["stream"]].append(text)
+            if on_output:
+                on_output(frame["stream"], text)
+
+        start = time.perf_counter()
+        worker = self._acquire()
+        acquired = time.perf_counter() - start
+        try:
+            reply = worker.request({"id": next(self._ids), "code": code, "input": "" if input_path else user_input,
+                                    "input_path": input_path, "timeout": timeout,
+                                    "stream": on_output is not None, "max_output": max_output_bytes,
+                                    "limits": limits.as_dict() if limits else None,
+                                    "optimize": optimize,
+                                    "trace": trace.as_dict() if trace else None}, on_frame, cancel)
+        except BaseException:
+            # The reply stream is out of sync now; this worker can't be reused
+            worker.proc.kill()
+            worker.proc.wait()
+            raise
+        finally:
+            self._release(worker)
+            if spooled:
+                os.unlink(spooled)
+
+        return ProcessResult(
+            stdout="".join(parts["stdout"]),
+            stderr="".join(parts["stderr"]),
+            returncode=reply["returncode"],
+            timed_out=reply["timed_out"],
+            truncated=reply["truncated"],
+            wall_time=time.perf_counter() - start,
+            cpu_user=reply["cpu_user"],
+            cpu_sys=reply["cpu_sys"],
+            peak_rss_kb=reply["peak_rss_kb"],
+            spawn_time=acquired + reply["spawn_time"],
+            cancelled=reply["cancelled"],
+        )
+
+    def shutdown(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+        with self._lock:
+            self._started = 0
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def shared_python_pool():
+    """Process-wide PythonWorkerPool, or None where fork isn't available."""
+    global _shared_pool
+    if not PythonWorkerPool.supported():
+        return None
+    with _shared_lock:
+        if _shared_pool is None:
+            import atexit
+            _shared_pool = PythonWorkerPool()
+            atexit.register(_shared_pool.shutdown)
+        return _shared_pool
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,190 @@
+"""
+Persistent memo of finished runs, so clicking Run again on the same code and
+input returns the previous result instantly.
+
+Entries are small JSON files named after a hash of (language, toolchain
+version, source hash, stdin hash, run settings) under <cache>/results. They
+expire after a TTL, and least recently used entries are evicted once the
+directory grows past max_bytes. Only runs that look deterministic are stored:
+they finished on their own (no timeout, no output cap, not killed by a signal),
+the source doesn't reach for clocks, randomness, threads, files or the
+environment, and the output holds no memory addresses. Python runs use a fixed
+hash seed (see compiler.pyWorker), so set order is repeatable too.
+
+This is best effort, meant for programs whose output depends on stdin alone.
+The checks are textual: they can't see C++ reading uninitialized memory, or a
+file opened in some way the patterns miss. The key covers the code and stdin
+only, so such a program can be answered with a stale result.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+
+from compiler.buildCache import default_cache_dir
+
+# Sources matching these can print something different on every run, or read
+# something other than stdin (files, the environment) that the key doesn't cover
+NONDETERMINISTIC = {
+    "Python": re.compile(r"\b(random|time|datetime|uuid|secrets|threading|multiprocessing|"
+                         r"concurrent|os|pathlib|io|glob|shutil|sqlite3|subprocess|fileinput)\b|"
+                         r"\b(id|hash|open)\s*\("),
+    "Java": re.compile(r"\b(Random|ThreadLocalRandom|SecureRandom|UUID|currentTimeMillis|nanoTime|"
+                       r"Math\.random|Instant|LocalDateTime|Thread|hashCode|identityHashCode|"
+                       r"File|Files|FileReader|FileInputStream|Paths|getenv)\b"),
+    "C++": re.compile(r"\b(rand|srand|random_device|time|clock|chrono|thread|async|getpid|"
+                      r"fopen|ifstream|fstream|getenv)\b|%p|<<\s*&|\(\s*(const\s+)?void\s*\*\s*\)"),
+}
+# Output that prints an address (a pointer, or a default Python repr) changes between runs
+ADDRESS = re.compile(r"\b0x[0-9a-fA-F]{6,}\b")
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def source_is_deterministic(language, code):
+    pattern = NONDETERMINISTIC.get(language)
+    return not (pattern and pattern.search(code))
+
+
+def is_deterministic(language, code, result):
+    """True if result is safe to replay for the same code and input."""
+    if result.timed_out or result.truncated or result.cancelled or result.returncode < 0:
+        return False
+    if ADDRESS.search(result.stdout) or ADDRESS.search(result.stderr):
+        return False
+    return source_is_deterministic(language, code)
+
+
+class ResultCache:
+    def __init__(self, cache_dir=None, max_bytes=32 * 1024 * 1024, ttl=7 * 24 * 3600):
+        self.cache_dir = cache_dir or os.path.join(default_cache_dir(), "results")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._bytes = sum(size for _, size, _ in self._entries())
+
+    def key(self, language, toolchain, code, user_input, settings=()):
+        parts = (language, toolchain, _digest(code), _digest(user_input), json.dumps(list(settings)))
+        return _digest("\0".join(parts))
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    # ---------------- Lookup / Store -----------------
+    def lookup(self, key):
+        """Returns the stored result fields (a dict) or None."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        if time.time() - entry["created"] > self.ttl:
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry["result"]
+
+    def store(self, key, result):
+        data = json.dumps({"created": time.time(), "result": asdict(result)})
+        if len(data) > self.max_bytes // 4:
+            return  # one huge output shouldn't flush everything else
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(prefix="tmp-", dir=self.cache_dir)
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        with self._lock:
+            try:
+                replaced = os.path.getsize(path)  # overwriting an entry: count only the difference
+            except OSError:
+                replaced = 0
+            os.replace(tmp, path)
+            self._bytes += len(data) - replaced
+            over = self._bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    # ---------------- Eviction -----------------
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except OSError:
+            return
+        with self._lock:
+            self._bytes -= size
+
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            # Trim to 3/4 of the cap so we don't rescan on every store
+            for _, size, path in entries:
+                if total <= self.max_bytes * 3 // 4:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+            self._bytes = total
+
+    def clear(self):
+        for _, _, path in self._entries():
+            self._remove(path)
+
+    # ---------------- Stats -----------------
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries()),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_result_cache():
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResultCache()
+        return _shared_cache
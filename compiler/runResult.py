@@ -0,0 +1,143 @@
+"""
+Structured outcome of one Run: what happened, the program's output, and how
+long each stage of the pipeline took.
+
+Stages (seconds; None when the stage didn't happen for this run):
+    write    source written to the workspace
+    compile  g++/javac, or the build cache lookup that made it unnecessary
+    spawn    starting the child (Popen, or worker hand-off + fork)
+    execute  the program running, until its exit was collected
+    cleanup  workspace hand-back and result cache bookkeeping
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+
+from compiler.process import ProcessResult
+
+STAGES = ("write", "compile", "spawn", "execute", "cleanup")
+
+
+class RunStatus(Enum):
+    OK = "OK"
+    COMPILE_ERROR = "Compile Error"
+    RUNTIME_ERROR = "Runtime Error"
+    TIMEOUT = "Timed Out"
+    OUTPUT_LIMIT = "Output Limit Exceeded"
+    CANCELLED = "Cancelled"
+    ERROR = "Error"  # couldn't run at all: unsupported language, missing toolchain, server down
+
+
+@dataclass
+class StageTimings:
+    write: float = None
+    compile: float = None
+    spawn: float = None
+    execute: float = None
+    cleanup: float = None
+    _open: list = field(default_factory=list, repr=False, compare=False)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Adds the time spent in the block to stage `name`. Stages may nest; the
+        outer one is paused meanwhile, so writing the source during a compile
+        counts as write, not compile.
+        """
+        now = time.perf_counter()
+        if self._open:
+            self._add(self._open[-1][0], now - self._open[-1][1])
+        self._open.append([name, now])
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            name, since = self._open.pop()
+            self._add(name, end - since)
+            if self._open:
+                self._open[-1][1] = end
+
+    def _add(self, name, seconds):
+        setattr(self, name, (getattr(self, name) or 0.0) + seconds)
+
+    def add_process(self, result):
+        """Fills spawn/execute from a finished ProcessResult."""
+        spawn = result.spawn_time or 0.0
+        if result.spawn_time is not None:
+            self._add("spawn", spawn)
+        self._add("execute", max(0.0, result.wall_time - spawn))
+
+    @property
+    def total(self):
+        return sum(getattr(self, name) or 0.0 for name in STAGES)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in STAGES}
+
+    def describe(self):
+        """e.g. "compile 412.0 ms | spawn 1.3 ms | execute 8.9 ms"."""
+        return " | ".join(f"{name} {getattr(self, name) * 1000:.1f} ms"
+                          for name in STAGES if getattr(self, name) is not None)
+
+
+@dataclass
+class RunResult:
+    status: RunStatus
+    stdout: str = ""
+    stderr: str = ""
+    exit_code: int = None
+    timings: StageTimings = field(default_factory=StageTimings)
+    # The underlying ProcessResult (CPU time, peak RSS, cached flag); None if nothing ran
+    process: ProcessResult = None
+    error: str = ""  # compile/setup error text (COMPILE_ERROR, ERROR, compile TIMEOUT)
+
+    @classmethod
+    def of(cls, process, timings=None):
+        """Wraps a finished ProcessResult."""
+        if process.cancelled:
+            status = RunStatus.CANCELLED
+        elif process.timed_out:
+            status = RunStatus.TIMEOUT
+        elif process.truncated:
+            status = RunStatus.OUTPUT_LIMIT
+        elif process.returncode != 0:
+            status = RunStatus.RUNTIME_ERROR
+        else:
+            status = RunStatus.OK
+        return cls(status, process.stdout, process.stderr, process.returncode,
+                   timings or StageTimings(), process)
+
+    @classmethod
+    def failed(cls, error, timings=None):
+        """A run that never got to execute; compile errors are recognised by their prefix."""
+        status = RunStatus.COMPILE_ERROR if error.startswith("Compile Error") else RunStatus.ERROR
+        return cls(status, timings=timings or StageTimings(), error=error)
+
+    @property
+    def output(self):
+        return f"{self.stdout}{self.stderr}"
+
+    def render(self, max_output_bytes=None):
+        """The text the editor console shows for this run."""
+        if self.error:
+            return self.error
+        if self.status == RunStatus.CANCELLED:
+            return "Run cancelled."
+        if self.status == RunStatus.TIMEOUT:
+            return "Execution timed out."
+        text = self.output.strip() or "No output."
+        if self.status == RunStatus.OUTPUT_LIMIT:
+            limit = f" at {max_output_bytes} bytes" if max_output_bytes else ""
+            text += f"\n[Output truncated{limit}; program stopped.]"
+        return text
+
+    def summary(self):
+        """Status line for the editor: status, resource usage and stage timings."""
+        parts = [self.status.value]
+        if self.process:
+            parts.append(self.process.usage_summary())
+        stages = self.timings.describe()
+        if stages:
+            parts.append(stages)
+        return " | ".join(parts)
@@ -0,0 +1,68 @@
+/*
+ * memshim REPORT_FD PROGRAM [ARGS...]
+ *
+ * Runs PROGRAM and writes its peak RSS in KiB, as decimal text, to REPORT_FD.
+ *
+ * exec() folds the old address space's high-water mark into the new image's
+ * ru_maxrss, so a program started straight from the (large) Python process
+ * reports Python's peak. Here PROGRAM is exec'd from a fresh fork of this tiny
+ * process instead, which only adds memshim's own footprint (~1 MB).
+ *
+ * memshim exits the way PROGRAM did: same exit code, or same signal.
+ */
+#include <errno.h>
+#include <fcntl.h>
+#include <signal.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/resource.h>
+#include <sys/time.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+int main(int argc, char **argv) {
+    if (argc < 3) {
+        fprintf(stderr, "usage: memshim REPORT_FD PROGRAM [ARGS...]\n");
+        return 127;
+    }
+    int report = atoi(argv[1]);
+    fcntl(report, F_SETFD, FD_CLOEXEC);
+
+    pid_t pid = fork();
+    if (pid < 0) {
+        perror("memshim: fork");
+        return 127;
+    }
+    if (pid == 0) {
+        execvp(argv[2], argv + 2);
+        fprintf(stderr, "memshim: %s: %s\n", argv[2], strerror(errno));
+        _exit(127);
+    }
+
+    int status;
+    struct rusage ru;
+    while (wait4(pid, &status, 0, &ru) < 0) {
+        if (errno != EINTR) {
+            perror("memshim: wait4");
+            return 127;
+        }
+    }
+    dprintf(report, "%ld\n", ru.ru_maxrss);
+    close(report);
+
+    if (WIFSIGNALED(status)) {
+        int sig = WTERMSIG(status);
+        struct rlimit no_core = {0, 0};
+        sigset_t set;
+        setrlimit(RLIMIT_CORE, &no_core);
+        signal(sig, SIG_DFL);
+        sigemptyset(&set);
+        sigaddset(&set, sig);
+        sigprocmask(SIG_UNBLOCK, &set, NULL);
+        raise(sig);
+        return 128 + sig;
+    }
+    return WIFEXITED(status) ? WEXITSTATUS(status) : 127;
+}
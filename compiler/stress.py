@@ -0,0 +1,224 @@
+"""
+Differential stress testing: run a submission and a trusted reference solution
+(brute force or official) on thousands of random inputs until their outputs
+differ, then shrink the failing input to the smallest size that still fails.
+
+Both programs are compiled once and run in parallel child processes. Run it
+from the repository root:
+
+    python -m compiler.stress solution.cpp brute.py --iterations 2000 --max-size 8
+    python -m compiler.stress solution.py brute.py --generator gen.py
+
+A generator program reads "<seed> <size>" from stdin and prints one input.
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+
+from compiler.comp import Compiler
+from compiler.judge import Verdict, outputs_match
+
+EXT_LANG = {ext: lang for lang, ext in Compiler.LANG_EXT.items()}
+
+
+def small_array(n, seed=0):
+    """Default generator: n, then n small integers (duplicates and negatives are likely)."""
+    rng = random.Random(seed)
+    return f"{n}\n" + " ".join(str(rng.randint(-10, 10)) for _ in range(n)) + "\n"
+
+
+class ProgramGenerator:
+    """Wraps a generator program as a generator(n, seed) callable."""
+
+    def __init__(self, code, language, compiler=None, timeout=None):
+        self.compiler = compiler or Compiler(language)
+        self.compiler.language = language
+        self.timeout = timeout or self.compiler.RUN_TIMEOUT
+        self.program, error = self.compiler.prepare(code)
+        if error:
+            raise ValueError(f"Generator failed to build:\n{error}")
+
+    def __call__(self, n, seed=0):
+        result = self.program.execute(f"{seed} {n}\n", timeout=self.timeout,
+                                      max_output_bytes=self.compiler.MAX_OUTPUT_BYTES)
+        if result.timed_out or result.returncode != 0:
+            raise RuntimeError(f"Generator failed on seed={seed} size={n}:\n{result.output.strip()}")
+        return result.stdout
+
+    def close(self):
+        self.program.close()
+
+
+@dataclass
+class Counterexample:
+    input: str
+    expected: str
+    actual: str
+    verdict: Verdict
+    seed: int
+    size: int
+
+
+@dataclass
+class StressReport:
+    iterations: int = 0
+    counterexample: Counterexample = None
+    shrunk_from: int = None  # size of the first failing input, if shrinking found a smaller one
+    elapsed: float = 0.0
+    error: str = ""
+
+    def summary(self):
+        if self.error:
+            return self.error
+        if not self.counterexample:
+            return f"No difference found in {self.iterations} random tests ({self.elapsed:.1f}s)."
+        c = self.counterexample
+        lines = [f"{c.verdict.value} after {self.iterations} tests (seed={c.seed}, size={c.size}"
+                 + (f", shrunk from size {self.shrunk_from})" if self.shrunk_from else ")"),
+                 "", "Input:", c.input.rstrip(), "", "Expected (reference):", c.expected.rstrip(),
+                 "", "Got:", c.actual.rstrip()]
+        return "\n".join(lines)
+
+
+def _compare(solution, reference, generator, seed, size, timeout, max_output_bytes):
+    """Returns a Counterexample, or None if both programs agree."""
+    user_input = generator(size, seed)
+    expected = reference.execute(user_input, timeout=timeout, max_output_bytes=max_output_bytes)
+    if expected.timed_out or expected.returncode != 0:
+        raise RuntimeError(f"Reference solution failed on seed={seed} size={size}:\n"
+                           f"{expected.output.strip() or 'timed out'}")
+    actual = solution.execute(user_input, timeout=timeout, max_output_bytes=max_output_bytes)
+    if actual.timed_out:
+        verdict = Verdict.TLE
+    elif actual.returncode != 0:
+        verdict = Verdict.RE
+    elif outputs_match(actual.stdout, expected.stdout):
+        return None
+    else:
+        verdict = Verdict.WA
+    return Counterexample(user_input, expected.stdout, actual.output, verdict, seed, size)
+
+
+def stress(code, reference, language, reference_language=None, generator=small_array, iterations=1000,
+           max_size=10, workers=4, timeout=None, shrink_tries=30, seed=0):
+    """
+    Compares code against reference on up to `iterations` generated inputs.
+    Sizes grow from 1 to max_size over the run so small counterexamples turn up
+    first. On a mismatch, smaller sizes are retried with fresh seeds (up to
+    shrink_tries each) to find a minimal failing input.
+    """
+    start = time.perf_counter()
+    solution_compiler = Compiler(language)
+    reference_compiler = Compiler(reference_language or language)
+    timeout = timeout or solution_compiler.RUN_TIMEOUT
+    max_output = solution_compiler.MAX_OUTPUT_BYTES
+
+    solution, error = solution_compiler.prepare(code)
+    if error:
+        return StressReport(error=f"Submission: {error}")
+    ref, error = reference_compiler.prepare(reference)
+    if error:
+        solution.close()
+        return StressReport(error=f"Reference: {error}")
+
+    for program in (solution, ref):
+        if program.python_pool:
+            # More threads than warm workers would only queue
+            workers = min(workers, program.python_pool.size)
+
+    report = StressReport()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            def check(i):
+                size = 1 + i * max_size // iterations
+                return i, _compare(solution, ref, generator, seed + i, size, timeout, max_output)
+
+            failure = None
+            pending = set()
+            next_i = 0
+            while (pending or next_i < iterations) and failure is None:
+                while next_i < iterations and len(pending) < workers * 2:
+                    pending.add(pool.submit(check, next_i))
+                    next_i += 1
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, found = future.result()
+                    report.iterations += 1
+                    if found and (failure is None or found.size < failure.size):
+                        failure = found
+            for future in pending:
+                future.cancel()
+
+            if failure:
+                report.counterexample = _shrink(pool, failure, solution, ref, generator, timeout,
+                                                max_output, shrink_tries)
+                if report.counterexample.size < failure.size:
+                    report.shrunk_from = failure.size
+    except RuntimeError as e:
+        report.error = str(e)
+    finally:
+        solution.close()
+        ref.close()
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def _shrink(pool, failure, solution, reference, generator, timeout, max_output, tries):
+    """
+    Smallest size (with any of `tries` seeds) that still shows a difference.
+    Inputs the reference (or generator) fails on are skipped: the failure we
+    already have is still a valid counterexample.
+    """
+    for size in range(1, failure.size):
+        seeds = [failure.seed * 7919 + size * 104729 + t for t in range(tries)]
+        futures = [pool.submit(_compare, solution, reference, generator, s, size, timeout, max_output)
+                   for s in seeds]
+        for future in futures:  # in seed order, so the result is reproducible
+            try:
+                found = future.result()
+            except RuntimeError:
+                continue
+            if found:
+                for f in futures:
+                    f.cancel()
+                return found
+    return failure
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential stress test against a reference solution")
+    parser.add_argument("solution")
+    parser.add_argument("reference")
+    parser.add_argument("--generator", help="program that reads '<seed> <size>' and prints an input")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--max-size", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    def load(path):
+        lang = EXT_LANG.get(os.path.splitext(path)[1])
+        if not lang:
+            parser.error(f"Can't tell the language of {path}")
+        with open(path) as f:
+            return f.read(), lang
+
+    code, language = load(args.solution)
+    reference, reference_language = load(args.reference)
+    generator = small_array
+    if args.generator:
+        generator = ProgramGenerator(*load(args.generator))
+    try:
+        report = stress(code, reference, language, reference_language, generator, args.iterations,
+                        args.max_size, args.workers, seed=args.seed)
+    finally:
+        if args.generator:
+            generator.close()
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
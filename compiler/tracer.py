@@ -0,0 +1,272 @@
+"""
+Execution tracer for Python submissions, feeding the visualization levels.
+
+Records calls the submission makes on lists, dicts and heapq (append, pop,
+heappush, ...) into a compact binary log that a pygame scene can replay with
+read_events(). The submission's source is instrumented before it is
+compiled: every call that could be one of OPS, such as `a.append(x)` or
+`heappush(h, x)`, becomes
+
+    (__dsa_method__(site, a, x)() if __dsa_next__(__dsa_gate_<site>__) else a.append(x))
+
+so the receiver and arguments are still evaluated once. The gate is a C
+iterator that comes up True once every sample_every calls of that call site;
+in between the call runs as written and no Python hook is involved. A sampled
+call records the real container and argument, then hands back a
+functools.partial of the call, so errors still come straight from the builtin.
+Call sites whose receiver turns out not to be a list, dict or heapq are
+switched off at their first sample. Subscript stores like a[i] = x are not
+calls and aren't recorded.
+
+Tracing is off unless a run asks for it (Compiler(trace=TraceOptions(...))),
+so timing runs pay nothing. sample_every, ops and max_events keep the
+overhead and log size down on hot loops.
+
+Log format: b"DSAT", a version byte, then fixed-size little-endian records
+(op, flags, line, container, value, size) — see RECORD.
+
+This file is also run directly (by the cold `python` path) as:
+
+    python tracer.py --log trace.bin [--sample N] [--ops list.append,...] main.py
+"""
+import argparse
+import ast
+import copy
+import heapq
+import os
+import struct
+import sys
+import traceback
+import types
+from collections import namedtuple
+from dataclasses import dataclass, asdict
+from functools import partial
+from itertools import chain, repeat
+
+MAGIC = b"DSAT"
+VERSION = 1
+# op, flags, source line, container number, value (first int argument), container size before the call
+RECORD = struct.Struct("<BBHIqI")
+FLAG_VALUE = 1  # value holds the call's first argument (an int); for heapq, the one after the heap
+
+OPS = (
+    "list.append", "list.pop", "list.insert", "list.extend", "list.remove", "list.sort",
+    "list.reverse", "list.clear",
+    "dict.get", "dict.setdefault", "dict.pop", "dict.popitem", "dict.update", "dict.clear",
+    "heapq.heappush", "heapq.heappop", "heapq.heapify", "heapq.heappushpop", "heapq.heapreplace",
+)
+OP_CODES = {name: i for i, name in enumerate(OPS)}
+
+TraceEvent = namedtuple("TraceEvent", "op line container value size")
+
+_FLUSH_BYTES = 64 * 1024
+_GATE = "__dsa_gate_{}__"
+# Each level of nested traced calls duplicates its arguments (one copy per branch); stop before that compounds
+_MAX_NESTING = 4
+
+
+@dataclass
+class TraceOptions:
+    path: str
+    sample_every: int = 1  # record one call in N at each call site
+    ops: tuple = None  # names from OPS; None records all of them
+    max_events: int = 1_000_000
+
+    def as_dict(self):
+        return asdict(self)
+
+
+class _Instrument(ast.NodeTransformer):
+    """Rewrites calls that may be traced ops into gated calls (see the module docstring)."""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self.nesting = 0
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr in self.tracer.method_names:
+            helper, target, name = "__dsa_method__", func.value, func.attr
+        elif isinstance(func, ast.Name) and func.id in self.tracer.function_names:
+            helper, target, name = "__dsa_function__", func, func.id
+        else:
+            return self.generic_visit(node)
+        if self.nesting >= _MAX_NESTING:
+            return self.generic_visit(node)
+        self.nesting += 1
+        node = self.generic_visit(node)
+        self.nesting -= 1
+
+        site = self.tracer.add_site(name, node.lineno)
+        sampled = ast.Call(
+            func=ast.Call(func=ast.Name(helper, ast.Load()),
+                          args=[ast.Constant(site), target, *node.args], keywords=node.keywords),
+            args=[], keywords=[])
+        gate = ast.Call(func=ast.Name("__dsa_next__", ast.Load()),
+                        args=[ast.Name(_GATE.format(site), ast.Load())], keywords=[])
+        return ast.copy_location(ast.IfExp(test=gate, body=sampled, orelse=copy.deepcopy(node)), node)
+
+
+class Tracer:
+    def __init__(self, path, sample_every=1, ops=None, max_events=1_000_000):
+        self.path = path
+        self.sample_every = max(1, sample_every)
+        self.ops = {OP_CODES[o] for o in ops} if ops else set(range(len(OPS)))
+        self.max_events = max_events
+        self.events = 0
+        # Calls worth instrumenting: a.<method>(...) and heapq.<function>(...), or a bare <function>(...)
+        traced = [OPS[op].split(".") for op in self.ops]
+        self.function_names = {name for owner, name in traced if owner == "heapq"}
+        self.method_names = {name for _, name in traced}
+        self._sites = []  # site number -> (name, source line, list op, dict op, heapq op); ops are None if untraced
+        self._buf = bytearray(MAGIC + bytes([VERSION]))
+        self._file = None
+        self._containers = {}
+        self._namespace = None
+
+    # ---------------- Instrumenting -----------------
+    def compile(self, source, filename, optimize=-1):
+        """compile() for the submission, with its traced call sites gated."""
+        tree = _Instrument(self).visit(ast.parse(source, filename))
+        return compile(ast.fix_missing_locations(tree), filename, "exec", optimize=optimize)
+
+    def add_site(self, name, line):
+        ops = [OP_CODES.get(f"{owner}.{name}") for owner in ("list", "dict", "heapq")]
+        self._sites.append((name, min(line, 0xFFFF), *(op if op in self.ops else None for op in ops)))
+        return len(self._sites) - 1
+
+    # ---------------- Recording -----------------
+    def _method(self, site, target, *args, **kwargs):
+        name, line, list_op, dict_op, heap_op = self._sites[site]
+        method = getattr(target, name, None)
+        if method is None:
+            self._switch_off(site)
+            return partial(getattr, target, name)  # raises the submission's AttributeError
+        if isinstance(target, list):
+            self._record(site, list_op, line, target, args[0] if args else None)
+        elif isinstance(target, dict):
+            self._record(site, dict_op, line, target, args[0] if args else None)
+        elif target is heapq:
+            self._record(site, heap_op, line, args[0] if args else None, args[1] if len(args) > 1 else None)
+        else:
+            self._switch_off(site)  # not a container we trace (deque, set, a class of its own...)
+        return partial(method, *args, **kwargs)
+
+    def _function(self, site, func, *args, **kwargs):
+        name, line, _, _, heap_op = self._sites[site]
+        if func is getattr(heapq, name, None):
+            self._record(site, heap_op, line, args[0] if args else None, args[1] if len(args) > 1 else None)
+        else:
+            self._switch_off(site)  # a function of the submission's own that happens to share the name
+        return partial(func, *args, **kwargs)
+
+    def _record(self, site, op, line, container, arg):
+        if self.events >= self.max_events:
+            self._switch_off_all()
+            return
+        if self.sample_every > 1:
+            # Next sample after sample_every - 1 untraced calls
+            self._namespace[_GATE.format(site)] = chain(repeat(False, self.sample_every - 1), (True,))
+        if op is None:
+            return  # e.g. list.pop traced but this call site popped from a dict
+        number = self._containers.setdefault(id(container), len(self._containers) + 1) \
+            if container is not None else 0
+        flags = 0
+        value = 0
+        if type(arg) is int and -2 ** 63 <= arg < 2 ** 63:
+            flags, value = FLAG_VALUE, arg
+        try:
+            size = len(container) if container is not None else 0
+        except TypeError:
+            size = 0
+        self._buf += RECORD.pack(op, flags, line, number, value, min(size, 0xFFFFFFFF))
+        self.events += 1
+        if len(self._buf) >= _FLUSH_BYTES:
+            self.flush()
+
+    def _switch_off(self, site):
+        self._namespace[_GATE.format(site)] = repeat(False)
+
+    def _switch_off_all(self):
+        for site in range(len(self._sites)):
+            self._switch_off(site)
+
+    def flush(self):
+        if self._file is None:
+            self._file = open(self.path, "wb")
+        self._file.write(self._buf)
+        self._buf = bytearray()
+
+    # ---------------- Control -----------------
+    def start(self, namespace):
+        """
+        Installs the helpers in namespace, the globals the compiled submission
+        runs in; every call site samples its first call.
+        """
+        self._namespace = namespace
+        namespace.update(__dsa_next__=next, __dsa_method__=self._method, __dsa_function__=self._function)
+        # Each site samples its first call; with sample_every=1 the gates stay open
+        for site in range(len(self._sites)):
+            namespace[_GATE.format(site)] = repeat(True) if self.sample_every == 1 else iter((True,))
+        return self
+
+    def stop(self):
+        """Switches every call site off and writes out the log."""
+        if self._namespace is not None:
+            self._switch_off_all()
+            self._namespace = None
+        self.flush()
+        self._file.close()
+        self._file = None
+
+
+def read_events(path):
+    """Yields TraceEvent(op name, line, container number, value or None, size) from a log."""
+    with open(path, "rb") as f:
+        header = f.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a trace log")
+        if header[-1] != VERSION:
+            raise ValueError(f"Unsupported trace log version {header[-1]}")
+        while True:
+            data = f.read(RECORD.size * 4096)
+            if not data:
+                return
+            for op, flags, line, container, value, size in RECORD.iter_unpack(data):
+                yield TraceEvent(OPS[op], line, container, value if flags & FLAG_VALUE else None, size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a Python file under the DSA-Arcade tracer")
+    parser.add_argument("--log", required=True)
+    parser.add_argument("--sample", type=int, default=1)
+    parser.add_argument("--ops", default="")
+    parser.add_argument("--max-events", type=int, default=1_000_000)
+    parser.add_argument("script")
+    args = parser.parse_args()
+
+    script = os.path.abspath(args.script)
+    with open(script) as f:
+        source = f.read()
+    sys.argv = [script]
+    sys.path[0] = os.path.dirname(script)
+    tracer = Tracer(args.log, args.sample, [o for o in args.ops.split(",") if o], args.max_events)
+    main_module = types.ModuleType("__main__")
+    main_module.__file__ = script
+    try:
+        program = tracer.compile(source, script)
+        sys.modules["__main__"] = main_module
+        tracer.start(main_module.__dict__)
+        exec(program, main_module.__dict__)
+    except SystemExit:
+        raise
+    except BaseException as e:
+        # Leave out our own frames (all of them for a syntax error), as `python main.py` would
+        tb = None if isinstance(e, SyntaxError) and e.filename == script else e.__traceback__.tb_next
+        traceback.print_exception(type(e), e, tb)
+        sys.exit(1)
+    finally:
+        tracer.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Reusable scratch directories for submissions, on a RAM-backed filesystem when
+one is available (/dev/shm on Linux), so source files and fresh binaries never
+touch a slow or network-mounted disk.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+
+
+def default_workspace_root():
+    """/dev/shm if it is usable, else the normal temp directory."""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return tempfile.gettempdir()
+
+
+def _clear_dir(path):
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+class WorkspacePool:
+    """
+    Pool of pre-created sandbox directories. acquire() hands out an empty one;
+    release() returns it dirty, and dirty directories are wiped together the
+    next time the clean ones run out (or on sweep()).
+    """
+
+    def __init__(self, root=None, prealloc=4):
+        self.base = tempfile.mkdtemp(prefix="dsa-arcade-ws-", dir=root or default_workspace_root())
+        self._clean = []
+        self._dirty = []
+        self._count = 0
+        self._lock = threading.Lock()
+        for _ in range(prealloc):
+            self._clean.append(self._new())
+
+    def _new(self):
+        self._count += 1
+        path = os.path.join(self.base, f"ws{self._count}")
+        os.mkdir(path)
+        return path
+
+    def acquire(self):
+        with self._lock:
+            if not self._clean and self._dirty:
+                self._sweep_locked()
+            if self._clean:
+                return self._clean.pop()
+            return self._new()
+
+    def release(self, path):
+        with self._lock:
+            self._dirty.append(path)
+
+    def sweep(self):
+        """Cleans every dirty workspace now."""
+        with self._lock:
+            self._sweep_locked()
+
+    def _sweep_locked(self):
+        for path in self._dirty:
+            _clear_dir(path)
+        self._clean.extend(self._dirty)
+        self._dirty = []
+
+    def close(self):
+        with self._lock:
+            shutil.rmtree(self.base, ignore_errors=True)
+            self._clean = []
+            self._dirty = []
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def shared_workspace_pool():
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = WorkspacePool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
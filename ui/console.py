@@ -0,0 +1,128 @@
+"""
+Output console that keeps program output in a bounded ring buffer and only
+renders the lines currently on screen.
+
+A plain ScrolledText holding a multi-megabyte result makes Tk re-layout the
+whole buffer on every insert and keeps a second copy of the text inside the
+widget. Here the Text widget only ever holds one screenful; scrolling swaps
+which slice of the buffer is shown.
+"""
+import collections
+import tkinter as tk
+from tkinter import font as tkfont
+
+
+class OutputConsole(tk.Frame):
+    MAX_LINES = 100_000
+    MAX_CHARS = 4 * 1024 * 1024
+    MAX_LINE_RENDER = 2000  # longer lines are cut when drawn, not in the buffer
+
+    def __init__(self, master, height=10, font=("Courier", 12), max_lines=None, max_chars=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.max_lines = max_lines or self.MAX_LINES
+        self.max_chars = max_chars or self.MAX_CHARS
+        self._lines = collections.deque([""])
+        self._chars = 0
+        self.dropped = 0  # lines evicted from the front of the buffer
+        self.top = 0  # first buffer line on screen
+        self.follow = True  # stick to the bottom while output arrives
+        self._render_job = None
+
+        self.text = tk.Text(self, height=height, wrap=tk.NONE, font=font, state=tk.DISABLED)
+        self.scrollbar = tk.Scrollbar(self, command=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self._linespace = tkfont.Font(font=font).metrics("linespace")
+        self.rows = height
+
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", lambda e: self._scroll_by(-3 if e.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.text.bind("<Button-5>", lambda e: self._scroll_by(3))
+
+    # ---------------- Buffer -----------------
+    def write(self, data):
+        """Appends text (which may end mid-line) to the buffer."""
+        if not data:
+            return
+        parts = data.split("\n")
+        self._lines[-1] += parts[0]
+        self._lines.extend(parts[1:])
+        self._chars += len(data)
+        while len(self._lines) > 1 and (len(self._lines) > self.max_lines or self._chars > self.max_chars):
+            self._chars -= len(self._lines.popleft()) + 1
+            self.dropped += 1
+        if self._chars > self.max_chars:  # one giant line: keep its tail
+            self._lines[0] = self._lines[0][-self.max_chars:]
+            self._chars = len(self._lines[0])
+        self._schedule_render()
+
+    def set_text(self, data):
+        self.clear()
+        self.write(data)
+
+    def clear(self):
+        self._lines.clear()
+        self._lines.append("")
+        self._chars = 0
+        self.dropped = 0
+        self.top = 0
+        self.follow = True
+        self._schedule_render()
+
+    def get_text(self):
+        """Everything still in the buffer (the widget only holds what's visible)."""
+        return "\n".join(self._lines)
+
+    # ---------------- Rendering -----------------
+    def _schedule_render(self):
+        if self._render_job is None:
+            self._render_job = self.after_idle(self._render)
+
+    def _render(self):
+        self._render_job = None
+        total = len(self._lines)
+        if self.follow:
+            self.top = max(0, total - self.rows)
+        self.top = max(0, min(self.top, total - 1))
+
+        visible = []
+        for i in range(self.top, min(total, self.top + self.rows)):
+            line = self._lines[i]
+            if len(line) > self.MAX_LINE_RENDER:
+                line = line[:self.MAX_LINE_RENDER] + f" ... [{len(line) - self.MAX_LINE_RENDER} more chars]"
+            visible.append(line)
+        if self.dropped and self.top == 0:
+            visible.insert(0, f"[... {self.dropped} earlier lines dropped]")
+            visible = visible[:self.rows]
+
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(visible))
+        self.text.config(state=tk.DISABLED)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + self.rows) / total))
+
+    # ---------------- Scrolling -----------------
+    def _scroll_to(self, top):
+        total = len(self._lines)
+        self.top = max(0, min(top, total - self.rows))
+        self.follow = self.top >= total - self.rows
+        self._schedule_render()
+
+    def _scroll_by(self, rows):
+        self._scroll_to(self.top + rows)
+        return "break"
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * len(self._lines)))
+        elif unit == "pages":
+            self._scroll_by(int(amount) * self.rows)
+        else:
+            self._scroll_by(int(amount))
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // self._linespace)
+        if rows != self.rows:
+            self.rows = rows
+            self._schedule_render()
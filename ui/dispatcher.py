@@ -0,0 +1,68 @@
+"""
+Hands UI updates from worker threads to the Tk main loop.
+
+Tk is not thread-safe: only the thread running mainloop() may touch widgets.
+Worker threads post() callables here instead; the main loop drains them once
+per frame with after(). Consecutive updates with the same key are coalesced,
+so a burst of output chunks turns into one widget update per frame.
+"""
+import threading
+
+
+class UiDispatcher:
+    FRAME_MS = 16
+
+    def __init__(self, root, frame_ms=None):
+        self.root = root
+        self.frame_ms = frame_ms or self.FRAME_MS
+        self._pending = []  # [key, fn, args, append]
+        self._lock = threading.Lock()
+        self.posted = 0
+        self.coalesced = 0
+        self._job = root.after(self.frame_ms, self._drain)
+
+    def post(self, fn, *args, key=None):
+        """
+        Runs fn(*args) on the main thread. If the last pending update has the
+        same key it is replaced, so only the newest one runs.
+        """
+        with self._lock:
+            self.posted += 1
+            last = self._pending[-1] if self._pending else None
+            if key is not None and last and last[0] == key and not last[3]:
+                last[1:3] = fn, args
+                self.coalesced += 1
+            else:
+                self._pending.append([key, fn, args, False])
+
+    def post_text(self, fn, text, key):
+        """
+        Runs fn(text) on the main thread. Text posted back to back under the
+        same key is joined and delivered in a single call.
+        """
+        with self._lock:
+            self.posted += 1
+            last = self._pending[-1] if self._pending else None
+            if last and last[0] == key and last[3]:
+                last[2][0].append(text)
+                self.coalesced += 1
+            else:
+                self._pending.append([key, fn, [[text]], True])
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for _, fn, args, append in pending:
+            try:
+                if append:
+                    fn("".join(args[0]))
+                else:
+                    fn(*args)
+            except Exception as e:
+                print(f"UI update failed: {e!r}")
+        self._job = self.root.after(self.frame_ms, self._drain)
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
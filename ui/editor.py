@@ -1,20 +1,73 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext
+from tkinter import ttk, scrolledtext, filedialog
 from compiler.comp import Compiler
+from compiler.asyncComp import AsyncCompiler
+from compiler.judgeServer import RemoteCompiler
+import os
+from compiler.judge import judge, parse_cases, Verdict
+from compiler.complexity import profile
+from compiler.benchmark import benchmark
+from compiler.diagnostics import SpeculativeChecker
+from compiler.generators import GENERATORS
+from compiler.process import FileInput
+from compiler.runResult import RunResult, RunStatus
+from compiler.problemBank import DIFFICULTIES
+from compiler.leaderboard import score, Score
+import math
 import threading
-from compiler.terminalRead import readTerminal
+from ui.highlighter import SyntaxHighlighter
+from ui.console import OutputConsole
+from ui.dispatcher import UiDispatcher
 
 class CodeEditorUI:
-    def __init__(self, root):
+    # Pause in typing before the background syntax check / speculative build
+    IDLE_CHECK_MS = 600
+
+    DEFAULT_CODE = {
+        "Python": 'print("Hello, World!")',
+        "Java": 'public class Main {\n    public static void main(String[] args) {\n        System.out.println("Hello, World!");\n    }\n}',
+        "C++": '#include <iostream>\nusing namespace std;\n\nint main() {\n    cout << "Hello, World!" << endl;\n    return 0;\n}'
+    }
+
+    def __init__(self, root, judge_url=None, problem_bank=None, leaderboard=None):
         self.root = root
-        self.compiler = Compiler()
+        # Worker threads never touch widgets directly; they post updates here
+        self.ui = UiDispatcher(root)
+        # Point at a shared judge server (python -m compiler.judgeServer) instead of compiling locally
+        judge_url = judge_url or os.environ.get("DSA_ARCADE_JUDGE_URL")
+        self.remote = judge_url is not None
+        if self.remote:
+            self.compiler = RemoteCompiler(judge_url)
+        else:
+            # Opt-in: Java runs share one JVM, which submissions aren't isolated from (see compiler.jvmDaemon)
+            self.compiler = Compiler(use_jvm_daemon=os.environ.get("DSA_ARCADE_JVM_DAEMON") == "1")
+            # Runs are queued on the shared async scheduler instead of a thread per click
+            self.async_compiler = AsyncCompiler(compiler=self.compiler)
+            if self.compiler.python_pool:
+                # Start the Python workers now rather than on the first Run
+                threading.Thread(target=self.compiler.python_pool.warm_up, daemon=True).start()
+        # Checks and pre-builds the buffer while the learner pauses (local compiles only)
+        self.checker = None if self.remote else SpeculativeChecker()
+        self._idle_job = None
+        self._buffer_version = 0
+        # Cancel Event of the run in flight; starting another run sets it
+        self._run_cancel = None
         self.language = tk.StringVar(value="Python")
         self.last_output = ""  # Stores the latest terminal output
+        # Local problem bank (Advanced level); None hides the problem panel
+        self.problem_bank = problem_bank
+        self.problems = []  # ProblemSummary rows currently shown in the list
+        self.problem = None  # the selected Problem
+        # Accepted submissions are ranked here; None disables "your best vs class best"
+        self.leaderboard = leaderboard
 
         self.setup_ui()
         self.load_code_for_language("Python")
 
     def setup_ui(self):
+        if self.problem_bank:
+            self.setup_problem_panel()
+
         # Language selection
         tk.Label(self.root, text="Language:").pack(pady=5)
         self.lang_dropdown = ttk.Combobox(
@@ -26,22 +79,178 @@ class CodeEditorUI:
         # Code editor
         self.editor = scrolledtext.ScrolledText(self.root, wrap=tk.WORD, font=("Courier", 12))
         self.editor.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        self.highlighter = SyntaxHighlighter(self.editor, self.language.get())
+        self.editor.tag_configure("diag_error", underline=True, background="#ffe6e6")
+        self.editor.tag_configure("diag_warning", underline=True, background="#fff5cc")
+        self.editor.bind("<<Modified>>", self.on_buffer_changed)
+
+        # Diagnostics from the background check
+        self.diag_label = tk.Label(self.root, text="", anchor="w", fg="#b00020", font=("Courier", 10))
+        self.diag_label.pack(fill=tk.X, padx=10)
 
         # Input box
         tk.Label(self.root, text="Program Input (optional):").pack(pady=5)
         self.input_box = scrolledtext.ScrolledText(self.root, height=5, wrap=tk.WORD)
         self.input_box.pack(expand=False, fill=tk.BOTH, padx=10, pady=5)
 
+        # Where stdin comes from: the box above, a file, or a built-in generator (streamed)
+        src_frame = tk.Frame(self.root)
+        src_frame.pack(fill=tk.X, padx=10)
+        tk.Label(src_frame, text="Stdin:").pack(side=tk.LEFT)
+        self.input_source = ttk.Combobox(src_frame, values=["Input box", "File", *GENERATORS],
+                                         state="readonly", width=16)
+        self.input_source.set("Input box")
+        self.input_source.pack(side=tk.LEFT, padx=5)
+        self.input_source.bind("<<ComboboxSelected>>", self.choose_input_source)
+        tk.Label(src_frame, text="n:").pack(side=tk.LEFT)
+        self.input_size = tk.Entry(src_frame, width=10)
+        self.input_size.insert(0, "1000")
+        self.input_size.pack(side=tk.LEFT, padx=5)
+        tk.Label(src_frame, text="seed:").pack(side=tk.LEFT)
+        self.input_seed = tk.Entry(src_frame, width=6)
+        self.input_seed.insert(0, "0")
+        self.input_seed.pack(side=tk.LEFT, padx=5)
+        self.input_file_label = tk.Label(src_frame, text="", anchor="w")
+        self.input_file_label.pack(side=tk.LEFT, fill=tk.X, padx=5)
+        self.input_file = None
+
         # Buttons
         btn_frame = tk.Frame(self.root)
         btn_frame.pack(pady=5)
         tk.Button(btn_frame, text="Run", command=self.run_code_thread).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Stop", command=self.cancel_run).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Run Tests", command=self.run_tests_thread).pack(side=tk.LEFT, padx=5)
+        if self.problem_bank:
+            tk.Button(btn_frame, text="Submit", command=self.submit_thread).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Complexity", command=self.profile_code_thread).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Benchmark", command=self.benchmark_code_thread).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Reset", command=self.reset_code).pack(side=tk.LEFT, padx=5)
 
-        # Output console
-        self.output = scrolledtext.ScrolledText(self.root, height=10, wrap=tk.WORD, font=("Courier", 12))
+        # Output console (ring buffer; only the visible lines live in the widget)
+        self.output = OutputConsole(self.root, height=10, font=("Courier", 12))
         self.output.pack(expand=False, fill=tk.BOTH, padx=10, pady=10)
-        self.output.config(state=tk.DISABLED)
+
+        # Resource usage of the last run
+        self.stats_label = tk.Label(self.root, text="", anchor="w", font=("Courier", 10))
+        self.stats_label.pack(fill=tk.X, padx=10, pady=(0, 10))
+
+    def setup_problem_panel(self):
+        """Topic/difficulty filters, the matching problems and the selected statement."""
+        panel = tk.Frame(self.root)
+        panel.pack(fill=tk.X, padx=10, pady=(5, 0))
+
+        filters = tk.Frame(panel)
+        filters.pack(fill=tk.X)
+        tk.Label(filters, text="Topic:").pack(side=tk.LEFT)
+        self.topic_filter = ttk.Combobox(filters, values=["All", *(tag for tag, _ in self.problem_bank.tags())],
+                                         state="readonly", width=18)
+        self.topic_filter.set("All")
+        self.topic_filter.pack(side=tk.LEFT, padx=5)
+        tk.Label(filters, text="Difficulty:").pack(side=tk.LEFT)
+        self.difficulty_filter = ttk.Combobox(filters, values=["All", *DIFFICULTIES], state="readonly", width=8)
+        self.difficulty_filter.set("All")
+        self.difficulty_filter.pack(side=tk.LEFT, padx=5)
+        tk.Label(filters, text="Search:").pack(side=tk.LEFT)
+        self.problem_search = tk.Entry(filters, width=20)
+        self.problem_search.pack(side=tk.LEFT, padx=5)
+        for box in (self.topic_filter, self.difficulty_filter):
+            box.bind("<<ComboboxSelected>>", self.refresh_problems)
+        self.problem_search.bind("<KeyRelease>", self.refresh_problems)
+
+        body = tk.Frame(panel)
+        body.pack(fill=tk.X, pady=5)
+        self.problem_list = tk.Listbox(body, height=6, width=40, exportselection=False)
+        self.problem_list.pack(side=tk.LEFT, fill=tk.Y)
+        self.problem_list.bind("<<ListboxSelect>>", self.select_problem)
+        self.statement = scrolledtext.ScrolledText(body, height=6, wrap=tk.WORD, state=tk.DISABLED)
+        self.statement.pack(side=tk.LEFT, expand=True, fill=tk.BOTH, padx=(5, 0))
+        # Your best vs class best on the selected problem
+        self.standing_label = tk.Label(panel, text="", anchor="w", font=("Courier", 10))
+        self.standing_label.pack(fill=tk.X)
+        self.refresh_problems()
+
+    # ---------------- Problem Bank -----------------
+    def refresh_problems(self, event=None):
+        """Re-runs the (indexed) problem query for the current filters."""
+        topic, difficulty = self.topic_filter.get(), self.difficulty_filter.get()
+        self.problems = self.problem_bank.list(tag=None if topic == "All" else topic,
+                                               difficulty=None if difficulty == "All" else difficulty,
+                                               search=self.problem_search.get().strip() or None)
+        self.problem_list.delete(0, tk.END)
+        for p in self.problems:
+            self.problem_list.insert(tk.END, f"[{p.difficulty}] {p.title}")
+
+    def select_problem(self, event=None):
+        selection = self.problem_list.curselection()
+        if not selection:
+            return
+        self.problem = self.problem_bank.get(self.problems[selection[0]].id)
+        self.statement.config(state=tk.NORMAL)
+        self.statement.delete(1.0, tk.END)
+        self.statement.insert(tk.END, f"{self.problem.title}  ({self.problem.difficulty}; "
+                                      f"{', '.join(self.problem.tags)})\n\n{self.problem.statement}")
+        self.statement.config(state=tk.DISABLED)
+        self.refresh_standing()
+
+    def refresh_standing(self):
+        """Shows the leaderboard standing for the current problem and language."""
+        if self.problem is None:
+            return
+        self.standing_label.config(text="")
+        if self.leaderboard:
+            threading.Thread(target=self.load_standing, args=(self.problem, self.language.get()),
+                             daemon=True).start()
+
+    def load_standing(self, problem, language):
+        """Reads the leaderboard on a worker thread and posts the result."""
+        self.ui.post(self.show_standing, problem, self.leaderboard.standing(problem.slug, language))
+
+    def show_standing(self, problem, standing):
+        if self.problem is None or problem.id != self.problem.id or standing.language != self.language.get():
+            return  # another problem or language was selected meanwhile
+        self.standing_label.config(text=standing.summary())
+
+    def submit_thread(self):
+        if self.problem is None:
+            self.output.set_text("Pick a problem from the list first.")
+            return
+        code = self.editor.get(1.0, tk.END)
+        threading.Thread(target=self.submit_solution, args=(code, self.language.get(), self.problem)).start()
+
+    def submit_solution(self, code, language, problem):
+        """Judges code against the problem's stored test data. Runs on a worker thread."""
+        self.ui.post(self.output.set_text, f"Judging {problem.title}...")
+        try:
+            report = self.problem_bank.judge(problem.id, code, language, compiler=self.compiler)
+        except Exception as e:
+            self.ui.post(self.output.set_text, f"Could not judge {problem.title}: {e}")
+            return
+        self.last_output = f"{problem.title}: {report.summary()}"
+        self.ui.post(self.output.set_text, self.last_output)
+        if report.verdict != Verdict.CE:
+            self.ui.post(self.show_test_results, report)
+        if self.leaderboard and report.verdict == Verdict.AC:
+            self.record_score(code, language, problem)
+
+    def record_score(self, code, language, problem):
+        """Times an accepted submission for the leaderboard. Runs on a worker thread."""
+        if self.remote:
+            # Leaderboard times must come from this machine's toolchains, not a shared server's
+            self.ui.post(self.output.set_text, f"{self.last_output}\nNot ranked: judged remotely.")
+            return
+        self.ui.post(self.output.set_text, f"{self.last_output}\nTiming the largest tests for the leaderboard...")
+        try:
+            result = score(code, language, self.problem_bank.cases(problem.id), timeout=problem.time_limit)
+        except Exception as e:
+            result = Score(language, "", error=f"Error: {e}")
+        if result.error:
+            self.ui.post(self.output.set_text, f"{self.last_output}\nNot ranked: {result.error}")
+            return
+        self.ui.post(self.output.set_text, f"{self.last_output}\nLeaderboard time: {result.runtime * 1000:.1f} ms "
+                                           f"over the {result.cases} largest tests ({result.mode})")
+        self.leaderboard.record(problem.slug, result)
+        self.leaderboard.flush()  # this is a worker thread; the write itself is batched
+        self.load_standing(problem, language)
 
     # ---------------- Language Switching -----------------
     def switch_language(self, event=None):
@@ -49,60 +258,320 @@ class CodeEditorUI:
         self.language.set(selected_lang)
         self.compiler.language = selected_lang
         self.load_code_for_language(selected_lang)
+        self.refresh_standing()
 
     def load_code_for_language(self, lang):
         self.compiler.language = lang
-
-        defaults = {
-            "Python": 'print("Hello, World!")',
-            "Java": 'public class Main {\n    public static void main(String[] args) {\n        System.out.println("Hello, World!");\n    }\n}',
-            "C++": '#include <iostream>\nusing namespace std;\n\nint main() {\n    cout << "Hello, World!" << endl;\n    return 0;\n}'
-        }
+        self.highlighter.set_language(lang)
 
         # Always load default Hello World for the language
-        code_to_load = defaults[lang]
+        code_to_load = self.DEFAULT_CODE[lang]
         self.editor.delete(1.0, tk.END)
         self.editor.insert(tk.END, code_to_load)
 
+    # ---------------- Background Check -----------------
+    def on_buffer_changed(self, event=None):
+        """Restarts the idle timer and drops any check of the old buffer."""
+        if not self.editor.edit_modified():
+            return
+        self.editor.edit_modified(False)
+        self._buffer_version += 1
+        if not self.checker:
+            return
+        self.checker.cancel()
+        if self._idle_job is not None:
+            self.root.after_cancel(self._idle_job)
+        self._idle_job = self.root.after(self.IDLE_CHECK_MS, self.start_background_check)
+
+    def start_background_check(self):
+        self._idle_job = None
+        version = self._buffer_version
+        code = self.editor.get(1.0, tk.END)
+        self.checker.submit(code, self.language.get(),
+                            lambda diagnostics: self.ui.post(self.show_diagnostics, version, diagnostics,
+                                                             key="diagnostics"))
+
+    def show_diagnostics(self, version, diagnostics):
+        if version != self._buffer_version:
+            return  # the buffer changed while we were checking
+        for tag in ("diag_error", "diag_warning"):
+            self.editor.tag_remove(tag, 1.0, tk.END)
+        for d in diagnostics:
+            start = f"{d.line}.{max(d.column - 1, 0)}" if d.column else f"{d.line}.0"
+            self.editor.tag_add(f"diag_{d.severity}", start, f"{d.line}.end")
+        if diagnostics:
+            first = diagnostics[0]
+            more = f"  (+{len(diagnostics) - 1} more)" if len(diagnostics) > 1 else ""
+            self.diag_label.config(text=f"Line {first.line}: {first.message}{more}")
+        else:
+            self.diag_label.config(text="")
+
     # ---------------- Reset Code -----------------
     def reset_code(self):
         lang = self.language.get()
         self.load_code_for_language(lang)
         self.input_box.delete(1.0, tk.END)
-        self.output.config(state=tk.NORMAL)
-        self.output.delete(1.0, tk.END)
-        self.output.config(state=tk.DISABLED)
+        self.output.clear()
+        self.stats_label.config(text="")
         self.last_output = ""
 
+    # ---------------- Program Input -----------------
+    def choose_input_source(self, event=None):
+        if self.input_source.get() == "File":
+            path = filedialog.askopenfilename(title="Program input file")
+            if not path:
+                self.input_source.set("Input box")
+                return
+            self.input_file = path
+            self.input_file_label.config(text=os.path.basename(path))
+        else:
+            self.input_file_label.config(text="")
+
+    def current_input(self):
+        """
+        Stdin for Run/Benchmark: the input box text, or a FileInput / generator
+        StreamInput that is streamed into the program without passing through Tk.
+        """
+        source = self.input_source.get()
+        if source == "File" and self.input_file:
+            return FileInput(self.input_file)
+        if source in GENERATORS:
+            try:
+                n, seed = int(self.input_size.get()), int(self.input_seed.get())
+            except ValueError:
+                n, seed = 1000, 0
+            return GENERATORS[source](n, seed=seed)
+        return self.input_box.get(1.0, tk.END)
+
     # ---------------- Run Code -----------------
     def run_code_thread(self):
-        threading.Thread(target=self.run_code).start()
-
-    def run_code(self):
+        """
+        Queues the run on the async compiler; the result is shown when it
+        finishes. A run still in flight is cancelled first (compiler or
+        program killed), so only the latest click ever reaches the console.
+        """
         code = self.editor.get(1.0, tk.END)
-        user_input = self.input_box.get(1.0, tk.END)
-        self.output.config(state=tk.NORMAL)
-        self.output.delete(1.0, tk.END)
-        self.output.insert(tk.END, "Running...")
-        self.output.config(state=tk.DISABLED)
+        user_input = self.current_input()
+        cancel = self.begin_run()
+        if self.remote:
+            # the server does the queueing
+            threading.Thread(target=self.run_code, args=(code, user_input, cancel)).start()
+            return
+        self.show_running()
+        future = self.async_compiler.submit(code, user_input, on_output=self.stream_to_console(cancel),
+                                            cancel=cancel, language=self.compiler.language)
+        future.add_done_callback(lambda f: self.finish_run(f, cancel))
+
+    def finish_run(self, future, cancel):
+        """Done callback of an async run: shows its RunResult, or what stopped it from producing one."""
+        if future.cancelled():
+            run = RunResult(RunStatus.CANCELLED)
+        elif future.exception() is not None:
+            run = RunResult.failed(f"Error: {future.exception()}")
+        else:
+            run = future.result()
+        self.ui.post(self.show_run_result, run, cancel)
+
+    def run_code(self, code=None, user_input=None, cancel=None):
+        """Runs synchronously on the calling thread; widgets are updated via the dispatcher."""
+        if code is None:
+            code = self.editor.get(1.0, tk.END)
+            user_input = self.current_input()
+        self.ui.post(self.show_running)
+        run = self.compiler.run_code(code, user_input or "", on_output=self.stream_to_console(cancel),
+                                     cancel=cancel)
+        self.ui.post(self.show_run_result, run, cancel)
+
+    def begin_run(self):
+        """Cancels the run in flight, if any, and returns the cancel Event for a new one."""
+        self.cancel_run()
+        self._run_cancel = threading.Event()
+        return self._run_cancel
+
+    def cancel_run(self):
+        if self._run_cancel:
+            self._run_cancel.set()
+
+    def is_stale(self, cancel):
+        """True for a run that a newer one has replaced."""
+        return cancel is not None and cancel is not self._run_cancel
 
-        # Run code
-        result = self.compiler.run_code(code, user_input)
+    def show_running(self):
+        self.output.set_text("Running...")
+
+    def stream_to_console(self, cancel=None):
+        """
+        Returns an on_output callback that replaces "Running..." with live output.
+        It may be called from any thread; chunks are merged into one write per frame.
+        Output of a run that has since been replaced is dropped.
+        """
+        started = []
+
+        def write(text):
+            if self.is_stale(cancel):
+                return
+            if not started:
+                self.output.clear()
+                started.append(True)
+            self.output.write(text)
+
+        def on_output(stream, text):
+            # Keyed per run, so a stale run's chunks are never merged into the new run's
+            self.ui.post_text(write, text, key=("output", id(cancel)))
+
+        return on_output
+
+    def show_run_result(self, run, cancel=None):
+        """Shows a RunResult: console text, plus status, usage and stage timings below it."""
+        if self.is_stale(cancel):
+            return
+        self.stats_label.config(text=run.summary())
 
         # Display in Tkinter terminal
-        self.output.config(state=tk.NORMAL)
-        self.output.delete(1.0, tk.END)
-        self.output.insert(tk.END, result)
-        self.output.config(state=tk.DISABLED)
+        self.output.set_text(run.render(self.compiler.MAX_OUTPUT_BYTES))
 
         # Store latest terminal output
-        self.last_output = readTerminal(self.output)
+        self.last_output = self.output.get_text()
 
         # --- AUTOMATIC: print output to console ---
         print("=== Last Terminal Output ===")
         print(self.last_output)
         print("============================")
 
+    # ---------------- Run Test Cases -----------------
+    def run_tests_thread(self):
+        code = self.editor.get(1.0, tk.END)
+        tests = self.input_box.get(1.0, tk.END)
+        threading.Thread(target=self.run_tests, args=(code, tests, self.language.get())).start()
+
+    def run_tests(self, code, tests, language):
+        """
+        Judges code against the test cases in tests, written as input / --- /
+        expected output blocks separated by === lines. Runs on a worker thread.
+        """
+        cases = parse_cases(tests)
+        if not cases:
+            self.ui.post(self.output.set_text, "No test cases found. Write them in the input box as:\n"
+                                               "<input>\n---\n<expected output>\n===\n<next input>...")
+            return
+        self.ui.post(self.output.set_text, f"Running {len(cases)} test cases...")
+
+        if self.remote:
+            try:
+                report = self.compiler.judge(code, cases)
+            except (OSError, RuntimeError) as e:
+                self.ui.post(self.output.set_text, f"Judge server error: {e}")
+                return
+        else:
+            try:
+                report = judge(code, language, cases, compiler=self.compiler)
+            except Exception as e:
+                self.ui.post(self.output.set_text, f"Error: {e}")
+                return
+
+        self.last_output = report.summary()
+        self.ui.post(self.output.set_text, self.last_output)
+
+        if report.verdict != Verdict.CE:
+            self.ui.post(self.show_test_results, report)
+
+    def show_test_results(self, report):
+        win = tk.Toplevel(self.root)
+        win.title("Test Results")
+        tk.Label(win, text=report.summary()).pack(pady=5)
+
+        columns = ("case", "verdict", "time", "exit")
+        table = ttk.Treeview(win, columns=columns, show="headings", height=min(len(report.cases), 20))
+        for col, heading, width in zip(columns, ("#", "Verdict", "Time (ms)", "Exit code"), (50, 180, 100, 80)):
+            table.heading(col, text=heading)
+            table.column(col, width=width, anchor=tk.CENTER)
+        for case in report.cases:
+            table.insert("", tk.END, values=(case.index + 1, case.verdict.name,
+                                             f"{case.wall_time * 1000:.1f}", case.exit_code))
+        table.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+
+    # ---------------- Complexity Profiler -----------------
+    def profile_code_thread(self):
+        code = self.editor.get(1.0, tk.END)
+        threading.Thread(target=self.profile_code, args=(code, self.language.get())).start()
+
+    def profile_code(self, code, language):
+        """
+        Runs code on random arrays of growing size (n on the first line, then
+        n integers) and estimates its time complexity. Runs on a worker thread.
+        """
+        self.ui.post(self.output.set_text, "Profiling on growing inputs (n = 100 ... 1,000,000)...")
+
+        # Profiling times runs on this machine, so it always compiles locally
+        compiler = Compiler(language) if self.remote else self.compiler
+        try:
+            report = profile(code, language, compiler=compiler)
+        except Exception as e:
+            self.ui.post(self.output.set_text, f"Error: {e}")
+            return
+
+        self.last_output = report.summary()
+        self.ui.post(self.output.set_text, self.last_output)
+
+        if len(report.samples) >= 2:
+            self.ui.post(self.show_complexity_plot, report)
+
+    # ---------------- Benchmark -----------------
+    def benchmark_code_thread(self):
+        code = self.editor.get(1.0, tk.END)
+        user_input = self.current_input()
+        threading.Thread(target=self.benchmark_code, args=(code, user_input, self.language.get())).start()
+
+    def benchmark_code(self, code, user_input, language, runs=10, warmup=2):
+        """Optimized build, `runs` timed runs on the program input after a warm-up."""
+        self.ui.post(self.output.set_text, f"Benchmarking ({warmup} warm-up + {runs} runs)...")
+
+        # Like profiling, timings only make sense on this machine
+        try:
+            report = benchmark(code, language, user_input, runs=runs, warmup=warmup,
+                               compiler=Compiler(language, release=True))
+        except Exception as e:
+            self.ui.post(self.output.set_text, f"Error: {e}")
+            return
+
+        self.last_output = report.summary()
+        self.ui.post(self.output.set_text, self.last_output)
+
+    def show_complexity_plot(self, report, width=420, height=300, pad=40):
+        """Log-log plot of runtime against n."""
+        win = tk.Toplevel(self.root)
+        win.title(f"Complexity: {report.estimate or '?'}")
+        canvas = tk.Canvas(win, width=width, height=height, bg="white")
+        canvas.pack(padx=10, pady=10)
+
+        points = [(s.n, s.wall_time) for s in report.samples if s.wall_time > 0]
+        xs = [math.log10(n) for n, _ in points]
+        ys = [math.log10(t) for _, t in points]
+        x0, x1 = min(xs), max(xs)
+        y0, y1 = min(ys), max(ys)
+        if x1 == x0:
+            x1 = x0 + 1
+        if y1 == y0:
+            y1 = y0 + 1
+
+        def to_canvas(x, y):
+            return (pad + (x - x0) / (x1 - x0) * (width - 2 * pad),
+                    height - pad - (y - y0) / (y1 - y0) * (height - 2 * pad))
+
+        canvas.create_line(pad, height - pad, width - pad, height - pad)
+        canvas.create_line(pad, pad, pad, height - pad)
+        canvas.create_text(width // 2, height - 12, text="n (log scale)")
+        canvas.create_text(14, height // 2, text="time", angle=90)
+
+        coords = [to_canvas(x, y) for x, y in zip(xs, ys)]
+        if len(coords) >= 2:
+            canvas.create_line(*[c for xy in coords for c in xy], fill="steelblue", width=2)
+        for (cx, cy), (n, t) in zip(coords, points):
+            canvas.create_oval(cx - 3, cy - 3, cx + 3, cy + 3, fill="steelblue")
+            canvas.create_text(cx, cy - 12, text=f"{t * 1000:.0f}ms", font=("Courier", 8))
+            canvas.create_text(cx, height - pad + 12, text=f"{n:g}", font=("Courier", 8))
+        tk.Label(win, text=f"Estimated complexity: {report.estimate or 'not enough data'}").pack(pady=5)
+
     # ---------------- Getter for terminal output -----------------
     def get_last_output(self):
         """
@@ -0,0 +1,260 @@
+"""
+Incremental syntax highlighting for the code editor.
+
+Only lines touched by an edit are re-tokenized. Edits are intercepted at the
+Tk widget command, so typing, pasting, undo and programmatic inserts are all
+seen with their exact line range. Work is debounced and tags are applied per
+tag in one tag_add call per batch of lines.
+
+Multi-line constructs (block comments, triple-quoted strings) are handled by
+remembering the tokenizer state at the start of every line: when re-tokenizing
+a line changes the state it hands to the next line, that line becomes dirty
+too, so opening a /* only re-colours as far as it actually reaches.
+"""
+import heapq
+import re
+
+_STRING = r'"(?:\\.|[^"\\])*"?'
+_CHAR = r"'(?:\\.|[^'\\])*'?"
+_NUMBER = r"\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*\.?\d*(?:[eE][+-]?\d+)?)[lLfFuU]*\b"
+
+
+def _words(*words):
+    return r"\b(?:" + "|".join(words) + r")\b"
+
+
+# Order matters: block openers must win over plain strings/comments
+LANGUAGE_RULES = {
+    "Python": [
+        ("block", r'"""|\'\'\''),
+        ("comment", r"#.*"),
+        ("string", _STRING + "|" + _CHAR),
+        ("keyword", _words("False", "None", "True", "and", "as", "assert", "async", "await", "break",
+                           "class", "continue", "def", "del", "elif", "else", "except", "finally", "for",
+                           "from", "global", "if", "import", "in", "is", "lambda", "nonlocal", "not", "or",
+                           "pass", "raise", "return", "try", "while", "with", "yield")),
+        ("builtin", _words("print", "input", "len", "range", "int", "str", "float", "list", "dict", "set",
+                           "tuple", "sorted", "min", "max", "sum", "map", "zip", "enumerate", "open",
+                           "abs", "any", "all", "reversed", "self")),
+        ("number", _NUMBER),
+    ],
+    "Java": [
+        ("block", r"/\*"),
+        ("comment", r"//.*"),
+        ("string", _STRING + "|" + _CHAR),
+        ("keyword", _words("abstract", "boolean", "break", "byte", "case", "catch", "char", "class",
+                           "continue", "default", "do", "double", "else", "enum", "extends", "final",
+                           "finally", "float", "for", "if", "implements", "import", "instanceof", "int",
+                           "interface", "long", "new", "package", "private", "protected", "public",
+                           "return", "short", "static", "super", "switch", "this", "throw", "throws",
+                           "try", "var", "void", "while", "true", "false", "null")),
+        ("builtin", _words("String", "System", "Math", "Integer", "Long", "List", "ArrayList", "Map",
+                           "HashMap", "Set", "HashSet", "Arrays", "Collections", "Scanner")),
+        ("number", _NUMBER),
+    ],
+    "C++": [
+        ("block", r"/\*"),
+        ("comment", r"//.*"),
+        ("preprocessor", r"^\s*#\s*\w+"),
+        ("string", _STRING + "|" + _CHAR),
+        ("keyword", _words("auto", "bool", "break", "case", "catch", "char", "class", "const",
+                           "constexpr", "continue", "default", "delete", "do", "double", "else", "enum",
+                           "false", "float", "for", "if", "inline", "int", "long", "namespace", "new",
+                           "nullptr", "private", "protected", "public", "return", "short", "signed",
+                           "sizeof", "static", "struct", "switch", "template", "this", "throw", "true",
+                           "try", "typedef", "typename", "unsigned", "using", "virtual", "void", "while")),
+        ("builtin", _words("std", "cout", "cin", "endl", "string", "vector", "map", "set",
+                           "unordered_map", "unordered_set", "pair", "queue", "stack", "priority_queue",
+                           "sort", "swap", "min", "max")),
+        ("number", _NUMBER),
+    ],
+}
+
+_BLOCK_CLOSERS = {'"""': '"""', "'''": "'''", "/*": "*/"}
+
+TAG_COLORS = {
+    "keyword": "#0000cc",
+    "builtin": "#7a3e9d",
+    "string": "#a31515",
+    "comment": "#008000",
+    "number": "#098658",
+    "preprocessor": "#af5f00",
+}
+
+
+class Tokenizer:
+    """Line tokenizer that carries an open block (comment/string) across lines."""
+
+    def __init__(self, language):
+        self.language = language
+        rules = LANGUAGE_RULES.get(language, [])
+        self.pattern = re.compile("|".join(f"(?P<{name}>{rx})" for name, rx in rules)) if rules else None
+
+    @staticmethod
+    def _block_tag(closer):
+        return "comment" if closer == "*/" else "string"
+
+    def tokenize(self, line, state=None):
+        """
+        Returns ([(tag, start, end), ...], end_state). state is the closing
+        delimiter of a block left open by an earlier line, or None.
+        """
+        tokens = []
+        pos = 0
+        if state:
+            end = line.find(state)
+            if end == -1:
+                return [(self._block_tag(state), 0, len(line))] if line else [], state
+            pos = end + len(state)
+            tokens.append((self._block_tag(state), 0, pos))
+        if self.pattern is None:
+            return tokens, None
+
+        search = self.pattern.search
+        while True:
+            m = search(line, pos)
+            if not m:
+                return tokens, None
+            kind = m.lastgroup
+            if kind == "block":
+                closer = _BLOCK_CLOSERS[m.group()]
+                end = line.find(closer, m.end())
+                if end == -1:
+                    tokens.append((self._block_tag(closer), m.start(), len(line)))
+                    return tokens, closer
+                pos = end + len(closer)
+                tokens.append((self._block_tag(closer), m.start(), pos))
+            else:
+                tokens.append((kind, m.start(), m.end()))
+                pos = m.end() if m.end() > m.start() else m.end() + 1
+
+
+class SyntaxHighlighter:
+    """
+    Attaches to a tk.Text (or ScrolledText). Call set_language() when the
+    editor switches languages.
+    """
+    DEBOUNCE_MS = 30
+    BATCH_LINES = 400  # lines re-tokenized per idle callback
+
+    def __init__(self, text, language="Python"):
+        self.text = text
+        self.tokenizer = Tokenizer(language)
+        self._states = [None]  # tokenizer state at the start of each line
+        self._dirty = set()
+        self._job = None
+
+        for tag, color in TAG_COLORS.items():
+            text.tag_configure(tag, foreground=color)
+        text.tag_raise("sel")
+
+        # Route the widget's Tcl command through us to see every edit
+        self._orig = text._w + "_orig"
+        text.tk.call("rename", text._w, self._orig)
+        text.tk.createcommand(text._w, self._proxy)
+        self.rehighlight()
+
+    def set_language(self, language):
+        self.tokenizer = Tokenizer(language)
+        self.rehighlight()
+
+    def rehighlight(self):
+        """Marks the whole buffer dirty."""
+        lines = self._line_count()
+        self._states = [None] * lines
+        self._dirty = set(range(1, lines + 1))
+        self._schedule()
+
+    # ---------------- Edit tracking -----------------
+    def _call(self, *args):
+        return self.text.tk.call((self._orig,) + args)
+
+    def _line_of(self, index):
+        line = int(str(self._call("index", index)).split(".")[0])
+        return min(line, self._line_count())
+
+    def _line_count(self):
+        return int(str(self._call("index", "end-1c")).split(".")[0])
+
+    def _proxy(self, command, *args):
+        if command in ("insert", "delete", "replace") and args:
+            try:
+                self._track(command, args)
+            except Exception:
+                self._states = None  # bad index etc.: Tk raises below, then we recover
+        result = self._call(command, *args)
+        if command in ("insert", "delete", "replace"):
+            if self._states is None or len(self._states) != self._line_count():
+                self.rehighlight()
+            else:
+                self._schedule()
+        return result
+
+    def _track(self, command, args):
+        start = self._line_of(args[0])
+        removed = 0
+        inserted = ""
+        if command == "delete":
+            if len(args) > 2:  # several ranges at once; rare enough to redo everything
+                self._states = None
+                return
+            end = self._line_of(args[1]) if len(args) > 1 else start
+            removed = max(0, end - start)
+        elif command == "replace":
+            removed = max(0, self._line_of(args[1]) - start)
+            inserted = "".join(args[2::2])
+        else:
+            inserted = "".join(args[1::2])
+        added = inserted.count("\n")
+        if not removed and not added:
+            self._dirty.add(start)
+            return
+
+        # Keep per-line states and pending dirty lines aligned with the buffer
+        self._states[start:start + removed] = [None] * added
+        shift = added - removed
+        self._dirty = {line + shift if line > start + removed else line
+                       for line in self._dirty if not start < line <= start + removed}
+        self._dirty.update(range(start, start + added + 1))
+
+    # ---------------- Re-tokenizing -----------------
+    def _schedule(self):
+        if self._job is not None:
+            self.text.after_cancel(self._job)
+        self._job = self.text.after(self.DEBOUNCE_MS, self._flush)
+
+    def _flush(self):
+        self._job = None
+        lines = self._line_count()
+        tags = {tag: [] for tag in TAG_COLORS}
+        cleared = []
+        done = 0
+        pending = sorted(self._dirty)  # a sorted list is already a valid heap
+        while pending and done < self.BATCH_LINES:
+            line = heapq.heappop(pending)
+            self._dirty.discard(line)
+            if line > lines:
+                continue
+            done += 1
+            state = self._states[line - 1]
+            text = self._call("get", f"{line}.0", f"{line}.end")
+            tokens, end_state = self.tokenizer.tokenize(text, state)
+
+            cleared += (f"{line}.0", f"{line}.end")
+            for tag, a, b in tokens:
+                tags[tag] += (f"{line}.{a}", f"{line}.{b}")
+
+            if line < lines and self._states[line] != end_state:
+                self._states[line] = end_state
+                if line + 1 not in self._dirty:  # an opened/closed block spills onto the next line
+                    self._dirty.add(line + 1)
+                    heapq.heappush(pending, line + 1)
+
+        if not cleared:
+            return
+        for tag, ranges in tags.items():
+            self._call("tag", "remove", tag, *cleared)
+            if ranges:
+                self._call("tag", "add", tag, *ranges)
+        if self._dirty:
+            self._job = self.text.after(1, self._flush)